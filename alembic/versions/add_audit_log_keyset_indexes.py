@@ -0,0 +1,47 @@
+"""Add keyset pagination indexes on audit_logs
+
+Revision ID: audit_log_keyset_indexes
+Revises: partitioned_audit_logs
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'audit_log_keyset_indexes'
+down_revision = 'partitioned_audit_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_audit_logs_entity_timeline', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_timestamp', table_name='audit_logs')
+    # (timestamp, id) keys in index order; action is included so filtering on it stays in the index
+    op.create_index(
+        'ix_audit_logs_timestamp_id', 'audit_logs', ['timestamp', 'id'],
+        unique=False, postgresql_include=['action'],
+    )
+    op.create_index(
+        'ix_audit_logs_user_timeline', 'audit_logs', ['user_id', 'timestamp', 'id'],
+        unique=False, postgresql_include=['action'],
+    )
+    op.create_index(
+        'ix_audit_logs_entity_timeline', 'audit_logs', ['entity_type', 'entity_id', 'timestamp', 'id'],
+        unique=False, postgresql_include=['action'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_logs_entity_timeline', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_user_timeline', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_timestamp_id', table_name='audit_logs')
+    op.create_index('ix_audit_logs_timestamp', 'audit_logs', ['timestamp'], unique=False)
+    op.create_index(
+        'ix_audit_logs_entity_timeline',
+        'audit_logs',
+        ['entity_type', 'entity_id', sa.text('timestamp DESC')],
+        unique=False,
+    )
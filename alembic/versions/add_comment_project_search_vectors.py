@@ -0,0 +1,47 @@
+"""Add generated search vectors on task comments and projects
+
+Revision ID: comment_project_search_vectors
+Revises: prefix_indexes
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'comment_project_search_vectors'
+down_revision = 'prefix_indexes'
+branch_labels = None
+depends_on = None
+
+# Must match the Computed expressions on the models
+SEARCH_VECTORS = {
+    'task_comments': "to_tsvector('italian'::regconfig, content)",
+    'projects': (
+        "setweight(to_tsvector('italian'::regconfig, coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('italian'::regconfig, coalesce(description, '')), 'B')"
+    ),
+}
+
+
+def upgrade() -> None:
+    for table, expression in SEARCH_VECTORS.items():
+        op.add_column(
+            table,
+            sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(expression, persisted=True)),
+        )
+        op.create_index(
+            f'ix_{table}_search_vector',
+            table,
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    for table in SEARCH_VECTORS:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,44 @@
+"""Add data_exports for background GDPR exports
+
+Revision ID: data_exports
+Revises: audit_log_keyset_indexes
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'data_exports'
+down_revision = 'audit_log_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'data_exports',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='dataexportstatus'), nullable=False),
+        sa.Column('progress', sa.JSON(), nullable=False),
+        sa.Column('file_path', sa.String(), nullable=True),
+        sa.Column('file_size', sa.BigInteger(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_data_exports_id'), 'data_exports', ['id'], unique=False)
+    op.create_index('ix_data_exports_user_id_created_at', 'data_exports', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_data_exports_user_id_created_at', table_name='data_exports')
+    op.drop_index(op.f('ix_data_exports_id'), table_name='data_exports')
+    op.drop_table('data_exports')
+    sa.Enum(name='dataexportstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,35 @@
+"""Add prefix indexes for search suggestions
+
+Revision ID: prefix_indexes
+Revises: title_trigram_indexes
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'prefix_indexes'
+down_revision = 'title_trigram_indexes'
+branch_labels = None
+depends_on = None
+
+# Under the "C" collation, whatever the database default, one btree on lower(column) serves both the
+# LIKE 'prefix%' range scan and ORDER BY lower(column), so the first suggestions come straight from it
+PREFIX_INDEXES = (
+    ('ix_tasks_title_prefix', 'tasks', 'title'),
+    ('ix_events_title_prefix', 'events', 'title'),
+    ('ix_users_full_name_prefix', 'users', 'full_name'),
+    ('ix_users_email_prefix', 'users', 'email'),
+)
+
+
+def upgrade() -> None:
+    for name, table, column in PREFIX_INDEXES:
+        op.create_index(name, table, [sa.text(f'lower({column}) COLLATE "C"')], unique=False)
+
+
+def downgrade() -> None:
+    for name, table, column in reversed(PREFIX_INDEXES):
+        op.drop_index(name, table_name=table)
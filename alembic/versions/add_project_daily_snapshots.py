@@ -0,0 +1,42 @@
+"""Add project daily snapshots
+
+Revision ID: project_daily_snapshots
+Revises: team_metrics_tables
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'project_daily_snapshots'
+down_revision = 'team_metrics_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'project_daily_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('todo_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('in_progress_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('blocked_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('done_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('remaining_estimate', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('spent', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        # Also serves the per-project day range reads of the timeseries endpoint
+        sa.UniqueConstraint('project_id', 'day', name='uq_project_daily_snapshots_project_day'),
+    )
+    op.create_index(op.f('ix_project_daily_snapshots_id'), 'project_daily_snapshots', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_project_daily_snapshots_id'), table_name='project_daily_snapshots')
+    op.drop_table('project_daily_snapshots')
@@ -0,0 +1,44 @@
+"""Add generated search vectors on tasks and events
+
+Revision ID: search_vectors
+Revises: project_daily_snapshots
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'search_vectors'
+down_revision = 'project_daily_snapshots'
+branch_labels = None
+depends_on = None
+
+# Title ranks above description; must match the Computed expressions on the models
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('italian'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('italian'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    for table in ('tasks', 'events'):
+        op.add_column(
+            table,
+            sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)),
+        )
+        op.create_index(
+            f'ix_{table}_search_vector',
+            table,
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    for table in ('events', 'tasks'):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,30 @@
+"""Add keyset index on task comments
+
+Revision ID: task_comments_keyset_idx
+Revises: add_source_calendars
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'task_comments_keyset_idx'
+down_revision = 'add_source_calendars'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves both the per-task comment count and (created_at, id) keyset pages
+    op.create_index(
+        'ix_task_comments_task_id_created_at_id',
+        'task_comments',
+        ['task_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_comments_task_id_created_at_id', table_name='task_comments')
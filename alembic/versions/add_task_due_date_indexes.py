@@ -0,0 +1,54 @@
+"""Add due date and assignee indexes for task filtering
+
+Revision ID: task_due_date_indexes
+Revises: task_recurrence_pointer
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'task_due_date_indexes'
+down_revision = 'task_recurrence_pointer'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Project boards filtered by status and due-date window
+    op.create_index(
+        'ix_tasks_project_id_status_due_date',
+        'tasks',
+        ['project_id', 'status', 'due_date'],
+        unique=False,
+    )
+    # Overdue lookups only ever look at open tasks
+    op.create_index(
+        'ix_tasks_due_date_open',
+        'tasks',
+        ['due_date'],
+        unique=False,
+        postgresql_where=sa.text("status <> 'DONE'"),
+    )
+    # "My tasks" lookups start from the user, hydration starts from the task
+    op.create_index(
+        'ix_task_assignees_user_id_task_id',
+        'task_assignees',
+        ['user_id', 'task_id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_task_assignees_task_id',
+        'task_assignees',
+        ['task_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_assignees_task_id', table_name='task_assignees')
+    op.drop_index('ix_task_assignees_user_id_task_id', table_name='task_assignees')
+    op.drop_index('ix_tasks_due_date_open', table_name='tasks')
+    op.drop_index('ix_tasks_project_id_status_due_date', table_name='tasks')
@@ -0,0 +1,69 @@
+"""Add recurrence pointer and instance columns to tasks
+
+Revision ID: task_recurrence_pointer
+Revises: tasks_board_idx
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from datetime import datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'task_recurrence_pointer'
+down_revision = 'tasks_board_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('next_occurrence_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tasks', sa.Column('recurrence_template_id', sa.Integer(), nullable=True))
+    op.add_column('tasks', sa.Column('occurrence_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_foreign_key(
+        'fk_tasks_recurrence_template_id_tasks',
+        'tasks', 'tasks',
+        ['recurrence_template_id'], ['id'],
+        ondelete='SET NULL',
+    )
+    # Only recurring templates carry a pointer, keep the index small
+    op.create_index(
+        'ix_tasks_next_occurrence_at',
+        'tasks',
+        ['next_occurrence_at'],
+        unique=False,
+        postgresql_where=sa.text('next_occurrence_at IS NOT NULL'),
+    )
+    # One instance per template and occurrence, makes generation idempotent
+    op.create_index(
+        'uq_tasks_recurrence_occurrence',
+        'tasks',
+        ['recurrence_template_id', 'occurrence_at'],
+        unique=True,
+    )
+
+    # Backfill the pointer of existing recurring tasks
+    from app.services.recurrence import next_occurrence
+
+    bind = op.get_bind()
+    now = datetime.now(timezone.utc)
+    rows = bind.execute(sa.text(
+        "SELECT id, recurrence, due_date, created_at FROM tasks WHERE recurrence IS NOT NULL"
+    )).all()
+    for task_id, recurrence, due_date, created_at in rows:
+        pointer = next_occurrence(recurrence, due_date or created_at or now, now)
+        if pointer is not None:
+            bind.execute(
+                sa.text("UPDATE tasks SET next_occurrence_at = :pointer WHERE id = :id"),
+                {"pointer": pointer, "id": task_id},
+            )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_tasks_recurrence_occurrence', table_name='tasks')
+    op.drop_index('ix_tasks_next_occurrence_at', table_name='tasks')
+    op.drop_constraint('fk_tasks_recurrence_template_id_tasks', 'tasks', type_='foreignkey')
+    op.drop_column('tasks', 'occurrence_at')
+    op.drop_column('tasks', 'recurrence_template_id')
+    op.drop_column('tasks', 'next_occurrence_at')
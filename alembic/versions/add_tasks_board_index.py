@@ -0,0 +1,30 @@
+"""Add board index on tasks
+
+Revision ID: tasks_board_idx
+Revises: task_comments_keyset_idx
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'tasks_board_idx'
+down_revision = 'task_comments_keyset_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the per-status window query and the column keyset pages of the board
+    op.create_index(
+        'ix_tasks_project_id_status_created_at_id',
+        'tasks',
+        ['project_id', 'status', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_project_id_status_created_at_id', table_name='tasks')
@@ -0,0 +1,67 @@
+"""Add team metric aggregate tables and task completion time
+
+Revision ID: team_metrics_tables
+Revises: task_due_date_indexes
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'team_metrics_tables'
+down_revision = 'task_due_date_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True))
+    # Best available approximation for tasks completed before the column existed
+    op.execute("UPDATE tasks SET completed_at = COALESCE(updated_at, created_at) WHERE status = 'DONE'")
+
+    op.create_table(
+        'team_daily_metrics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('team', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('tasks_created', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('tasks_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('lead_time_hours_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('active_tasks', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('team', 'day', name='uq_team_daily_metrics_team_day'),
+    )
+    op.create_index(op.f('ix_team_daily_metrics_id'), 'team_daily_metrics', ['id'], unique=False)
+
+    op.create_table(
+        'resource_daily_bookings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resource_id', sa.Integer(), nullable=False),
+        sa.Column('team', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('booked_hours', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['resource_id'], ['resources.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('resource_id', 'team', 'day', name='uq_resource_daily_bookings_resource_team_day'),
+    )
+    op.create_index(op.f('ix_resource_daily_bookings_id'), 'resource_daily_bookings', ['id'], unique=False)
+    # The dashboard reads a team's recent days
+    op.create_index(
+        'ix_resource_daily_bookings_team_day',
+        'resource_daily_bookings',
+        ['team', 'day'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_resource_daily_bookings_team_day', table_name='resource_daily_bookings')
+    op.drop_index(op.f('ix_resource_daily_bookings_id'), table_name='resource_daily_bookings')
+    op.drop_table('resource_daily_bookings')
+    op.drop_index(op.f('ix_team_daily_metrics_id'), table_name='team_daily_metrics')
+    op.drop_table('team_daily_metrics')
+    op.drop_column('tasks', 'completed_at')
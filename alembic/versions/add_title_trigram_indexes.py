@@ -0,0 +1,35 @@
+"""Add trigram indexes on task and event titles
+
+Revision ID: title_trigram_indexes
+Revises: search_vectors
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'title_trigram_indexes'
+down_revision = 'search_vectors'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Serve the substring / typo-tolerant search fallback (ILIKE and <% word similarity)
+    for table in ('tasks', 'events'):
+        op.create_index(
+            f'ix_{table}_title_trgm',
+            table,
+            ['title'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    for table in ('events', 'tasks'):
+        op.drop_index(f'ix_{table}_title_trgm', table_name=table)
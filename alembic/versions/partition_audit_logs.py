@@ -0,0 +1,110 @@
+"""Partition audit_logs by month and index entity timelines
+
+Revision ID: partitioned_audit_logs
+Revises: comment_project_search_vectors
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'partitioned_audit_logs'
+down_revision = 'comment_project_search_vectors'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'id, entity_type, entity_id, action, user_id, timestamp, diff, ip_address, user_agent'
+
+# Months created beyond the current one; the maintain_audit_partitions job keeps this many ahead
+PARTITIONS_AHEAD = 2
+
+
+def _audit_columns(id_column):
+    return [
+        id_column,
+        sa.Column('entity_type', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('action', postgresql.ENUM(name='auditaction', create_type=False), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('diff', sa.JSON(), nullable=False),
+        sa.Column('ip_address', sa.String(), nullable=True),
+        sa.Column('user_agent', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    ]
+
+
+def upgrade() -> None:
+    for index in ('ix_audit_logs_id', 'ix_audit_logs_entity_type', 'ix_audit_logs_entity_id', 'ix_audit_logs_timestamp'):
+        op.drop_index(index, table_name='audit_logs')
+    op.execute('ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned')
+    op.execute('ALTER TABLE audit_logs_unpartitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_unpartitioned_pkey')
+
+    # The partition key must be part of the primary key; ids keep coming from the existing sequence
+    op.create_table(
+        'audit_logs',
+        *_audit_columns(sa.Column('id', sa.Integer(), server_default=sa.text("nextval('audit_logs_id_seq')"), nullable=False)),
+        sa.PrimaryKeyConstraint('id', 'timestamp'),
+        postgresql_partition_by='RANGE (timestamp)',
+    )
+    op.execute('ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id')
+
+    # One partition per UTC month, from the oldest existing row to PARTITIONS_AHEAD months from now
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date := date_trunc('month', coalesce(
+                (SELECT min(timestamp) FROM audit_logs_unpartitioned), now()
+            ) AT TIME ZONE 'UTC');
+            last_month date := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{PARTITIONS_AHEAD} months';
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+                    'audit_logs_' || to_char(month, 'YYYY_MM'),
+                    month::text || ' 00:00:00+00',
+                    (month + interval '1 month')::date::text || ' 00:00:00+00'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+
+    op.execute(
+        f'INSERT INTO audit_logs ({COLUMNS}) '
+        f"SELECT {COLUMNS.replace('timestamp', 'coalesce(timestamp, now())')} FROM audit_logs_unpartitioned"
+    )
+    op.drop_table('audit_logs_unpartitioned')
+
+    op.create_index('ix_audit_logs_timestamp', 'audit_logs', ['timestamp'], unique=False)
+    op.create_index(
+        'ix_audit_logs_entity_timeline',
+        'audit_logs',
+        ['entity_type', 'entity_id', sa.text('timestamp DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_logs_entity_timeline', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_timestamp', table_name='audit_logs')
+    op.execute('ALTER TABLE audit_logs RENAME TO audit_logs_partitioned')
+    op.execute('ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey')
+
+    op.create_table(
+        'audit_logs',
+        *_audit_columns(sa.Column('id', sa.Integer(), server_default=sa.text("nextval('audit_logs_id_seq')"), nullable=False)),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute('ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id')
+    op.execute(f'INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_partitioned')
+    # Dropping the parent drops its partitions
+    op.drop_table('audit_logs_partitioned')
+
+    op.create_index('ix_audit_logs_id', 'audit_logs', ['id'], unique=False)
+    op.create_index('ix_audit_logs_entity_type', 'audit_logs', ['entity_type'], unique=False)
+    op.create_index('ix_audit_logs_entity_id', 'audit_logs', ['entity_id'], unique=False)
+    op.create_index('ix_audit_logs_timestamp', 'audit_logs', ['timestamp'], unique=False)
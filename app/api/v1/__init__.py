@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, calendars, events, tasks, dashboard, projects, search, collaboration, automations, integrations, security
+from app.api.v1 import auth, calendars, events, tasks, dashboard, projects, search, collaboration, automations, integrations, security, teams
 
 api_router = APIRouter(prefix="/api/v1")
 
@@ -15,4 +15,4 @@ api_router.include_router(collaboration.router)
 api_router.include_router(automations.router)
 api_router.include_router(integrations.router)
 api_router.include_router(security.router)
-
+api_router.include_router(teams.router)
@@ -4,7 +4,8 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import verify_password_async, get_password_hash_async, create_access_token
+from app.core.password_pool import PasswordPoolBusy
 from app.core.config import settings
 from app.core.dependencies import get_current_active_user
 from app.models.user import User
@@ -13,6 +14,17 @@ from app.schemas.user import UserCreate, UserResponse, Token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Seconds a client is told to wait when every password worker is busy
+PASSWORD_BUSY_RETRY_AFTER = 2
+
+
+def _password_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent logins, retry shortly",
+        headers={"Retry-After": str(PASSWORD_BUSY_RETRY_AFTER)},
+    )
+
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
@@ -26,9 +38,15 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
+    # Hand the connection back to the pool before possibly queueing for a password worker;
+    # the session checks out a new one for the inserts below
+    await db.close()
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await get_password_hash_async(user_data.password)
+    except PasswordPoolBusy:
+        raise _password_busy()
     new_user = User(
         email=user_data.email,
         password_hash=hashed_password,
@@ -68,8 +86,15 @@ async def login(
     # Find user by email
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
+    # Hand the connection back to the pool before possibly queueing for a password worker
+    await db.close()
+    
+    try:
+        password_ok = user is not None and await verify_password_async(form_data.password, user.password_hash)
+    except PasswordPoolBusy:
+        raise _password_busy()
     
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
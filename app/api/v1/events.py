@@ -14,6 +14,7 @@ from app.schemas.calendar import (
     EventAttendeeResponse,
     RSVPRequest,
 )
+from app.services.dashboard_service import invalidate_event_dashboards, invalidate_personal_dashboards
 
 router = APIRouter(prefix="/events", tags=["events"])
 
@@ -146,6 +147,7 @@ async def create_event(
     
     await db.commit()
     await db.refresh(new_event)
+    await invalidate_event_dashboards(db, [new_event.id])
     
     # Load attendees for response
     attendee_result = await db.execute(
@@ -270,6 +272,7 @@ async def update_event(
     
     await db.commit()
     await db.refresh(event)
+    await invalidate_event_dashboards(db, [event.id])
     
     # Load attendees
     attendee_result = await db.execute(
@@ -322,8 +325,15 @@ async def delete_event(
             detail="Only the creator can delete the event"
         )
     
+    # Read attendees before the cascade removes them
+    attendee_result = await db.execute(
+        select(EventAttendee.user_id).where(EventAttendee.event_id == event.id)
+    )
+    attendee_user_ids = attendee_result.scalars().all()
+    
     await db.delete(event)
     await db.commit()
+    await invalidate_personal_dashboards(attendee_user_ids)
     
     return None
 
@@ -361,6 +371,7 @@ async def update_rsvp(
     
     await db.commit()
     await db.refresh(attendee)
+    await invalidate_personal_dashboards([current_user.id])
     
     return EventAttendeeResponse(
         id=attendee.id,
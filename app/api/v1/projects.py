@@ -1,11 +1,19 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, tuple_, literal
+from sqlalchemy.orm import aliased
 from app.core.database import get_db
 from app.core.dependencies import get_current_active_user
+from app.core.pagination import encode_cursor, decode_cursor, parse_cursor_datetime
 from app.models.user import User
 from app.models.project import Project
+from app.models.task import Task, TaskStatus
+from app.models.metrics import ProjectDailySnapshot
+from app.schemas.task import TaskResponse
+from app.services.task_service import hydrate_tasks
+from app.services.timeseries import day_range, dense_series, moving_average
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/projects", tags=["projects"])
@@ -32,6 +40,66 @@ class ProjectResponse(ProjectBase):
         from_attributes = True
 
 
+class BoardColumn(BaseModel):
+    status: TaskStatus
+    count: int
+    estimate_total: float
+    spent_total: float
+    tasks: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+
+class BoardResponse(BaseModel):
+    project_id: int
+    columns: List[BoardColumn]
+
+
+class BoardColumnPage(BaseModel):
+    status: TaskStatus
+    tasks: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+
+class ProjectTimeseriesResponse(BaseModel):
+    project_id: int
+    days: List[date]
+    series: Dict[str, List[float]]
+    moving_average: Dict[str, List[float]]
+    window: int
+
+
+# Snapshot columns exposed by the timeseries endpoint
+TIMESERIES_FIELDS = [
+    "todo_count",
+    "in_progress_count",
+    "blocked_count",
+    "done_count",
+    "remaining_estimate",
+    "spent",
+]
+TIMESERIES_MAX_DAYS = 366
+
+
+async def _get_accessible_project(project_id: int, current_user: User, db: AsyncSession) -> Project:
+    """Load a project the current user owns or shares a team with."""
+    result = await db.execute(select(Project).where(Project.id == project_id))
+    project = result.scalar_one_or_none()
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    if project.owner_id != current_user.id and (project.team_id is None or project.team_id != current_user.team):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to project"
+        )
+    
+    return project
+
+
 @router.get("", response_model=List[ProjectResponse])
 async def list_projects(
     current_user: User = Depends(get_current_active_user),
@@ -70,3 +138,156 @@ async def create_project(
     
     return new_project
 
+
+
+@router.get("/{project_id}/board", response_model=BoardResponse)
+async def get_project_board(
+    project_id: int,
+    limit: int = Query(20, ge=1, le=100, description="Cards returned per column"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the kanban board of a project: per-status totals and the first cards of each column."""
+    await _get_accessible_project(project_id, current_user, db)
+    
+    # Rank and aggregate every column in a single pass over the project's tasks
+    ranked = (
+        select(
+            Task,
+            func.row_number().over(
+                partition_by=Task.status,
+                order_by=(Task.created_at, Task.id),
+            ).label("position"),
+            func.count(Task.id).over(partition_by=Task.status).label("column_count"),
+            func.coalesce(func.sum(Task.estimate).over(partition_by=Task.status), 0).label("estimate_total"),
+            func.coalesce(func.sum(Task.spent).over(partition_by=Task.status), 0).label("spent_total"),
+        )
+        .where(Task.project_id == project_id)
+        .subquery()
+    )
+    ranked_task = aliased(Task, ranked)
+    result = await db.execute(
+        select(
+            ranked_task,
+            ranked.c.column_count,
+            ranked.c.estimate_total,
+            ranked.c.spent_total,
+        )
+        .where(ranked.c.position <= limit)
+        .order_by(ranked.c.status, ranked.c.position)
+    )
+    rows = result.all()
+    
+    # Hydrate all cards of the board in one batch
+    task_responses = await hydrate_tasks(db, [row[0] for row in rows])
+    
+    columns = {
+        task_status: BoardColumn(status=task_status, count=0, estimate_total=0.0, spent_total=0.0, tasks=[])
+        for task_status in TaskStatus
+    }
+    for (task, column_count, estimate_total, spent_total), task_response in zip(rows, task_responses):
+        column = columns[task.status]
+        column.count = column_count
+        column.estimate_total = float(estimate_total)
+        column.spent_total = float(spent_total)
+        column.tasks.append(task_response)
+    
+    for column in columns.values():
+        if column.count > len(column.tasks):
+            last = column.tasks[-1]
+            column.next_cursor = encode_cursor(last.created_at, last.id)
+    
+    return BoardResponse(project_id=project_id, columns=list(columns.values()))
+
+
+@router.get("/{project_id}/board/{task_status}", response_model=BoardColumnPage)
+async def get_project_board_column(
+    project_id: int,
+    task_status: TaskStatus,
+    cursor: Optional[str] = Query(None, description="Cursor returned for this column"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Load more cards of a single board column using keyset pagination on (created_at, id)."""
+    await _get_accessible_project(project_id, current_user, db)
+    
+    query = select(Task).where(
+        Task.project_id == project_id,
+        Task.status == task_status,
+    )
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor, (parse_cursor_datetime, int))
+        query = query.where(
+            tuple_(Task.created_at, Task.id)
+            > tuple_(literal(cursor_created_at), literal(cursor_id))
+        )
+    
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(query.order_by(Task.created_at, Task.id).limit(limit + 1))
+    tasks = result.scalars().all()
+    
+    task_responses = await hydrate_tasks(db, tasks[:limit])
+    
+    next_cursor = None
+    if len(tasks) > limit:
+        last = task_responses[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    return BoardColumnPage(status=task_status, tasks=task_responses, next_cursor=next_cursor)
+
+
+@router.get("/{project_id}/metrics/timeseries", response_model=ProjectTimeseriesResponse)
+async def get_project_timeseries(
+    project_id: int,
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    window: int = Query(7, ge=1, le=90, description="Moving average window in days"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get burndown and cumulative-flow series of a project from its daily snapshots."""
+    await _get_accessible_project(project_id, current_user, db)
+    
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end or (end - start).days >= TIMESERIES_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range must be ordered and at most {TIMESERIES_MAX_DAYS} days"
+        )
+    
+    # Include the last snapshot before the range so leading gaps carry its state
+    previous_day = (
+        select(func.max(ProjectDailySnapshot.day))
+        .where(ProjectDailySnapshot.project_id == project_id, ProjectDailySnapshot.day < start)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(ProjectDailySnapshot.day, *[getattr(ProjectDailySnapshot, field) for field in TIMESERIES_FIELDS])
+        .where(
+            ProjectDailySnapshot.project_id == project_id,
+            ProjectDailySnapshot.day >= func.coalesce(previous_day, start),
+            ProjectDailySnapshot.day <= end,
+        )
+        .order_by(ProjectDailySnapshot.day)
+    )
+    rows = result.all()
+    
+    initial = None
+    if rows and rows[0][0] < start:
+        initial = dict(zip(TIMESERIES_FIELDS, rows[0][1:]))
+        rows = rows[1:]
+    
+    series = dense_series(start, end, rows, TIMESERIES_FIELDS, initial)
+    
+    return ProjectTimeseriesResponse(
+        project_id=project_id,
+        days=day_range(start, end),
+        series={field: values.tolist() for field, values in series.items()},
+        moving_average={
+            field: moving_average(series[field], window).round(4).tolist()
+            for field in ("done_count", "remaining_estimate", "spent")
+        },
+        window=window,
+    )
@@ -1,82 +1,124 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, func, text
+from sqlalchemy import select, func, or_, literal, union_all, String
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.lru import TTLCache
 from app.core.dependencies import get_current_active_user
 from app.models.user import User
-from app.models.task import Task
-from app.models.calendar import Event
-from pydantic import BaseModel
+from app.schemas.search import SearchResponse, SuggestHit, SuggestResponse
+from app.services.search_backend import SEARCH_SOURCES, get_search_backend
 
 router = APIRouter(prefix="/search", tags=["search"])
 
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
 
-class SearchResult(BaseModel):
-    type: str  # "task" or "event"
-    id: int
-    title: str
-    description: Optional[str] = None
-    score: Optional[float] = None
+# Hits returned by /search/suggest
+SUGGEST_LIMIT = 10
 
+# Types whose titles /search/suggest completes
+SUGGEST_TYPES = ("task", "event")
 
-class SearchResponse(BaseModel):
-    results: List[SearchResult]
-    total: int
 
+def _prefix_key(column):
+    """lower(column) under the "C" collation of the prefix indexes, for both LIKE and ORDER BY."""
+    return func.lower(column).collate("C")
 
-@router.get("", response_model=SearchResponse)
-async def search(
-    q: str = Query(..., description="Search query"),
-    type: Optional[str] = Query(None, description="Filter by type: task, event, or all"),
+
+# Recent (user, prefix) answers; a keystroke often extends a prefix already answered in full
+_suggest_cache = TTLCache(settings.SUGGEST_CACHE_SIZE, settings.SUGGEST_CACHE_TTL)
+
+
+def _cached_suggestions(user_id: int, prefix: str) -> Optional[List[SuggestHit]]:
+    """Hits for prefix from the cache, narrowing a shorter cached prefix whose answer was complete."""
+    hits = _suggest_cache.get((user_id, prefix))
+    if hits is not None:
+        return hits
+    
+    for end in range(len(prefix) - 1, 0, -1):
+        shorter = _suggest_cache.get((user_id, prefix[:end]))
+        # Fewer hits than the limit means every match of the shorter prefix is there
+        if shorter is not None and len(shorter) < SUGGEST_LIMIT:
+            return [
+                hit for hit in shorter
+                if hit.label.lower().startswith(prefix) or (hit.detail or "").lower().startswith(prefix)
+            ]
+    return None
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest(
+    q: str = Query(..., min_length=1, description="Prefix typed so far"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Full-text search across tasks and events."""
-    results = []
+    """Prefix autocomplete over task and event titles and user names/emails, cheap enough per keystroke."""
+    prefix = q.strip().lower()
+    if not prefix:
+        return SuggestResponse(results=[])
     
-    # Search tasks
-    if not type or type == "task" or type == "all":
-        # Using PostgreSQL full-text search
-        task_query = select(Task).where(
-            or_(
-                Task.title.ilike(f"%{q}%"),
-                Task.description.ilike(f"%{q}%"),
-                # Full-text search with tsvector (if configured)
-                func.to_tsvector('italian', func.coalesce(Task.title, '') + ' ' + func.coalesce(Task.description, '')).match(func.plainto_tsquery('italian', q))
+    hits = _cached_suggestions(current_user.id, prefix)
+    if hits is None:
+        # lower(column) LIKE 'prefix%' is a range scan on the prefix indexes, already in ORDER BY order
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        branches = []
+        for result_type in SUGGEST_TYPES:
+            source = SEARCH_SOURCES[result_type]
+            branches.append(
+                select(
+                    literal(result_type).label("type"),
+                    source.model.id.label("id"),
+                    source.title.label("label"),
+                    literal(None, String).label("detail"),
+                )
+                .where(source.visibility(current_user), _prefix_key(source.title).like(pattern))
+                .order_by(_prefix_key(source.title))
+                .limit(SUGGEST_LIMIT)
+            )
+        branches.append(
+            select(
+                literal("user").label("type"),
+                User.id.label("id"),
+                func.coalesce(User.full_name, User.email).label("label"),
+                User.email.label("detail"),
             )
+            .where(
+                User.is_active == True,
+                or_(_prefix_key(User.full_name).like(pattern), _prefix_key(User.email).like(pattern)),
+            )
+            .order_by(func.lower(func.coalesce(User.full_name, User.email)))
+            .limit(SUGGEST_LIMIT)
         )
-        
-        task_result = await db.execute(task_query)
-        tasks = task_result.scalars().all()
-        
-        for task in tasks:
-            results.append(SearchResult(
-                type="task",
-                id=task.id,
-                title=task.title,
-                description=task.description,
-            ))
     
-    # Search events
-    if not type or type == "event" or type == "all":
-        event_query = select(Event).where(
-            or_(
-                Event.title.ilike(f"%{q}%"),
-                Event.description.ilike(f"%{q}%"),
-            )
+        candidates = union_all(*branches).subquery()
+        result = await db.execute(
+            select(candidates)
+            .order_by(func.length(candidates.c.label), func.lower(candidates.c.label), candidates.c.type, candidates.c.id)
+            .limit(SUGGEST_LIMIT)
         )
-        
-        event_result = await db.execute(event_query)
-        events = event_result.scalars().all()
-        
-        for event in events:
-            results.append(SearchResult(
-                type="event",
-                id=event.id,
-                title=event.title,
-                description=event.description,
-            ))
+        hits = [
+            SuggestHit(type=row.type, id=row.id, label=row.label, detail=row.detail)
+            for row in result.all()
+        ]
     
-    return SearchResponse(results=results, total=len(results))
+    _suggest_cache.set((current_user.id, prefix), hits)
+    return SuggestResponse(results=hits)
+
 
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., description="Search query"),
+    type: Optional[str] = Query(None, description="Filter by type: task, event, comment, project, or all"),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous page"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Full-text search across the tasks, events, comments and projects visible to the caller, best matches first."""
+    types = [
+        result_type for result_type in SEARCH_SOURCES
+        if not type or type == "all" or type == result_type
+    ]
+    return await get_search_backend().search(db, current_user, q, types, limit, cursor)
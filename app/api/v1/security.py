@@ -1,17 +1,33 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from datetime import datetime, timedelta
+from sqlalchemy import select, func, update, and_, tuple_, literal
+from datetime import datetime, timedelta, timezone
+from app.core.cache import redis_available
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.dependencies import get_current_active_user
+from app.core.pagination import encode_cursor, decode_cursor, parse_cursor_datetime
+from app.core.dependencies import get_current_active_user, require_manager
+from app.core.principal import invalidate_principal
 from app.models.user import User
 from app.models.audit import AuditLog, AuditAction
+from app.models.gdpr import DataExport, DataExportStatus
+from app.workers.tasks import export_user_data_archive
 from pydantic import BaseModel
+from collections import deque
 import json
+import os
 
 router = APIRouter(prefix="/security", tags=["security"])
 
+AUDIT_MAX_PAGE = 500
+
+# Timeline entries returned (the most recent ones) and rows fetched per round trip while replaying
+AUDIT_TIMELINE_MAX_ENTRIES = 1000
+AUDIT_TIMELINE_BATCH = 1000
+
 
 class AuditLogResponse(BaseModel):
     id: int
@@ -28,6 +44,42 @@ class AuditLogResponse(BaseModel):
         from_attributes = True
 
 
+class AuditLogPage(BaseModel):
+    items: List[AuditLogResponse]
+    next_cursor: str | None = None
+
+
+class TimelineEntry(BaseModel):
+    id: int
+    timestamp: datetime
+    action: AuditAction
+    user_id: int
+    changes: dict  # Field diffs of this entry, {"field": {"old": ..., "new": ...}}
+    snapshot: dict | None  # Known fields after this entry; None once deleted
+
+
+class EntityTimeline(BaseModel):
+    entity_type: str
+    entity_id: int
+    complete: bool  # False when the history does not start with the entity's creation
+    state: dict | None  # Snapshot at the requested moment
+    entries: List[TimelineEntry]
+
+
+class DataExportResponse(BaseModel):
+    id: int
+    status: DataExportStatus
+    progress: dict  # Rows written per section so far
+    file_size: int | None
+    error: str | None
+    created_at: datetime
+    completed_at: datetime | None
+    expires_at: datetime | None
+
+    class Config:
+        from_attributes = True
+
+
 class GDPRExportResponse(BaseModel):
     user_data: dict
     events: List[dict]
@@ -35,28 +87,114 @@ class GDPRExportResponse(BaseModel):
     created_at: datetime
 
 
-@router.get("/audit-logs", response_model=List[AuditLogResponse])
+@router.get("/audit-logs", response_model=AuditLogPage)
 async def get_audit_logs(
     entity_type: str | None = None,
     entity_id: int | None = None,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
+    user_id: int | None = None,
+    action: AuditAction | None = None,
+    since: datetime | None = Query(None, description=f"Oldest timestamp; default {settings.AUDIT_RECENT_DAYS} days ago"),
+    until: datetime | None = Query(None, description="Newest timestamp, exclusive"),
+    cursor: str | None = Query(None, description="Cursor returned by the previous page"),
+    limit: int = Query(100, ge=1, le=AUDIT_MAX_PAGE),
+    current_user: User = Depends(require_manager),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get audit logs (filtered by entity if specified)."""
-    query = select(AuditLog)
+    """Get audit logs newest first, using keyset pagination on (timestamp, id). Managers and admins only."""
+    # Bounding timestamp lets PostgreSQL skip the monthly partitions outside the window
+    if since is None:
+        since = datetime.now(timezone.utc) - timedelta(days=settings.AUDIT_RECENT_DAYS)
+    keys = select(AuditLog.timestamp, AuditLog.id).where(AuditLog.timestamp >= since)
+    if until is not None:
+        keys = keys.where(AuditLog.timestamp < until)
     
     if entity_type:
-        query = query.where(AuditLog.entity_type == entity_type)
+        keys = keys.where(AuditLog.entity_type == entity_type)
     if entity_id:
-        query = query.where(AuditLog.entity_id == entity_id)
-    
-    query = query.order_by(AuditLog.timestamp.desc()).limit(limit)
+        keys = keys.where(AuditLog.entity_id == entity_id)
+    if user_id:
+        keys = keys.where(AuditLog.user_id == user_id)
+    if action:
+        keys = keys.where(AuditLog.action == action)
+    if cursor:
+        cursor_timestamp, cursor_id = decode_cursor(cursor, (parse_cursor_datetime, int))
+        keys = keys.where(
+            tuple_(AuditLog.timestamp, AuditLog.id)
+            < tuple_(literal(cursor_timestamp), literal(cursor_id))
+        )
     
-    result = await db.execute(query)
+    # Page keys come from an index (action is an INCLUDE column); only the page's rows are read from the heap
+    keys = keys.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc()).limit(limit + 1).subquery()
+    result = await db.execute(
+        select(AuditLog)
+        .join(keys, and_(AuditLog.id == keys.c.id, AuditLog.timestamp == keys.c.timestamp))
+        .order_by(keys.c.timestamp.desc(), keys.c.id.desc())
+    )
     logs = result.scalars().all()
     
-    return logs
+    next_cursor = None
+    if len(logs) > limit:
+        last = logs[limit - 1]
+        next_cursor = encode_cursor(last.timestamp, last.id)
+    
+    return AuditLogPage(items=logs[:limit], next_cursor=next_cursor)
+
+
+@router.get("/audit-logs/{entity_type}/{entity_id}/timeline", response_model=EntityTimeline)
+async def get_entity_timeline(
+    entity_type: str,
+    entity_id: int,
+    at: datetime | None = Query(None, description="Replay up to this moment; default now"),
+    current_user: User = Depends(require_manager),
+    db: AsyncSession = Depends(get_db),
+):
+    """Replay an entity's audit diffs, oldest first, into the snapshot after each change. Managers and admins only."""
+    query = (
+        select(AuditLog.timestamp, AuditLog.id, AuditLog.action, AuditLog.user_id, AuditLog.diff)
+        .where(AuditLog.entity_type == entity_type, AuditLog.entity_id == entity_id)
+        .order_by(AuditLog.timestamp, AuditLog.id)
+    )
+    if at is not None:
+        query = query.where(AuditLog.timestamp <= at)
+    
+    # Every change is replayed, but only the latest AUDIT_TIMELINE_MAX_ENTRIES are returned
+    state: dict | None = None
+    complete = False
+    entries: deque = deque(maxlen=AUDIT_TIMELINE_MAX_ENTRIES)
+    rows = await db.stream(query.execution_options(yield_per=AUDIT_TIMELINE_BATCH))
+    async for row in rows:
+        if row.action == AuditAction.CREATE:
+            state = {}
+            complete = True
+        elif row.action == AuditAction.DELETE:
+            state = None
+        if row.diff and row.action != AuditAction.DELETE:
+            if state is None:
+                state = {}
+            for field, change in row.diff.items():
+                state[field] = change.get("new")
+        entries.append(TimelineEntry(
+            id=row.id,
+            timestamp=row.timestamp,
+            action=row.action,
+            user_id=row.user_id,
+            changes=row.diff,
+            snapshot=dict(state) if state is not None else None,
+        ))
+    
+    if not entries:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No audit history for this entity"
+        )
+    
+    return EntityTimeline(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        complete=complete,
+        state=state,
+        entries=list(entries),
+    )
 
 
 @router.post("/audit-logs")
@@ -87,12 +225,15 @@ async def create_audit_log(
     return new_log
 
 
-@router.get("/gdpr/export", response_model=GDPRExportResponse)
+@router.get("/gdpr/export", response_model=GDPRExportResponse, deprecated=True)
 async def export_user_data(
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Export all user data for GDPR compliance."""
+    """Export the user's profile, created events and assigned tasks in one response.
+    
+    Superseded by POST /gdpr/exports, which covers every section in a background job.
+    """
     from app.models.calendar import Event, EventAttendee
     from app.models.task import Task, TaskAssignee, TaskWatcher
     
@@ -151,6 +292,104 @@ async def export_user_data(
     )
 
 
+@router.post("/gdpr/exports", response_model=DataExportResponse, status_code=status.HTTP_202_ACCEPTED)
+async def request_data_export(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Start a background export of all the user's data; poll it with GET /gdpr/exports/{id}."""
+    # One export in flight per user; asking again returns it. Unfinished ones with no heartbeat
+    # in the timeout are stuck (lost message or dead worker) and are failed by purge_expired_exports
+    stuck_before = datetime.now(timezone.utc) - timedelta(minutes=settings.GDPR_EXPORT_TIMEOUT_MINUTES)
+    result = await db.execute(
+        select(DataExport)
+        .where(
+            DataExport.user_id == current_user.id,
+            DataExport.status.in_([DataExportStatus.PENDING, DataExportStatus.RUNNING]),
+            func.coalesce(DataExport.heartbeat_at, DataExport.created_at) >= stuck_before,
+        )
+        .order_by(DataExport.created_at.desc())
+        .limit(1)
+    )
+    export = result.scalar_one_or_none()
+    if export is not None:
+        return export
+    
+    # The Celery broker is this Redis; publishing to it while it is down would hang the request
+    if not await redis_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Export queue unavailable, retry later"
+        )
+    
+    export = DataExport(user_id=current_user.id, status=DataExportStatus.PENDING, progress={})
+    db.add(export)
+    await db.commit()
+    
+    try:
+        # Fail fast instead of retrying the publish while the request waits
+        await run_in_threadpool(export_user_data_archive.apply_async, (export.id,), retry=False)
+    except Exception:
+        export.status = DataExportStatus.FAILED
+        export.error = "Could not queue the export"
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Export queue unavailable, retry later"
+        )
+    
+    return export
+
+
+async def _get_own_export(export_id: int, current_user: User, db: AsyncSession) -> DataExport:
+    result = await db.execute(
+        select(DataExport).where(DataExport.id == export_id, DataExport.user_id == current_user.id)
+    )
+    export = result.scalar_one_or_none()
+    if export is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    return export
+
+
+@router.get("/gdpr/exports/{export_id}", response_model=DataExportResponse)
+async def get_data_export(
+    export_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Status and per-section progress of a data export."""
+    return await _get_own_export(export_id, current_user, db)
+
+
+@router.get("/gdpr/exports/{export_id}/download")
+async def download_data_export(
+    export_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Download a finished export; the zip is streamed from disk in chunks."""
+    export = await _get_own_export(export_id, current_user, db)
+    if export.status != DataExportStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export is {export.status.value}"
+        )
+    if not export.file_path or not os.path.exists(export.file_path):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Export has expired, request a new one"
+        )
+    
+    return FileResponse(
+        export.file_path,
+        media_type="application/zip",
+        filename=os.path.basename(export.file_path),
+    )
+
+
 @router.delete("/gdpr/delete-account", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user_account(
     current_user: User = Depends(get_current_active_user),
@@ -159,8 +398,9 @@ async def delete_user_account(
     """Delete user account and all associated data (GDPR right to be forgotten)."""
     # In production, this should be a soft delete or anonymization
     # For now, we'll mark as inactive
-    current_user.is_active = False
+    await db.execute(update(User).where(User.id == current_user.id).values(is_active=False))
     await db.commit()
+    await invalidate_principal(current_user.id)
     
     return None
 
@@ -1,8 +1,9 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
-from datetime import datetime
+from sqlalchemy import select, update, delete, insert, and_, or_, any_, literal, tuple_, func, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from datetime import datetime, timezone
 from app.core.database import get_db
 from app.core.dependencies import get_current_active_user
 from app.models.user import User
@@ -25,11 +26,23 @@ from app.schemas.task import (
     TaskAssigneeResponse,
     TaskCommentCreate,
     TaskCommentResponse,
+    TaskCommentPage,
     TimeTrackingRequest,
+    TaskBulkUpdate,
+    TaskBulkResult,
+    TaskBulkUpdateResponse,
 )
+from app.services.automation_engine import AutomationEngine
+from app.services.task_service import hydrate_tasks
+from app.services.recurrence import next_occurrence
+from app.services.dashboard_service import invalidate_task_dashboards
+from app.core.pagination import encode_cursor, decode_cursor, parse_cursor_datetime
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# Upper bound on the number of tasks a single bulk update may touch
+BULK_UPDATE_MAX_TASKS = 1000
+
 
 @router.get("", response_model=List[TaskResponse])
 async def list_tasks(
@@ -37,6 +50,11 @@ async def list_tasks(
     status: Optional[TaskStatus] = Query(None),
     priority: Optional[TaskPriority] = Query(None),
     assignee_id: Optional[int] = Query(None),
+    due_before: Optional[datetime] = Query(None),
+    due_after: Optional[datetime] = Query(None),
+    overdue: bool = Query(False, description="Only open tasks past their due date"),
+    sort: Optional[str] = Query(None, pattern="^(due_date|priority|updated_at)$"),
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: comments"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -53,64 +71,30 @@ async def list_tasks(
         # Filter by assignee
         assignee_query = select(TaskAssignee.task_id).where(TaskAssignee.user_id == assignee_id)
         query = query.where(Task.id.in_(assignee_query))
+    if due_before:
+        query = query.where(Task.due_date < due_before)
+    if due_after:
+        query = query.where(Task.due_date >= due_after)
+    if overdue:
+        query = query.where(
+            Task.due_date < datetime.now(timezone.utc),
+            Task.status != TaskStatus.DONE,
+        )
+    
+    # Sort keys match the composite task indexes, id keeps the order stable
+    if sort == "due_date":
+        query = query.order_by(Task.due_date.asc().nulls_last(), Task.id)
+    elif sort == "priority":
+        query = query.order_by(Task.priority.desc(), Task.id)
+    elif sort == "updated_at":
+        query = query.order_by(Task.updated_at.desc().nulls_last(), Task.id)
     
     result = await db.execute(query)
     tasks = result.scalars().all()
     
-    # Load related data for each task
-    task_list = []
-    for task in tasks:
-        # Load assignees
-        assignee_result = await db.execute(
-            select(TaskAssignee).where(TaskAssignee.task_id == task.id)
-        )
-        assignees = assignee_result.scalars().all()
-        
-        assignee_responses = []
-        for assignee in assignees:
-            user_result = await db.execute(
-                select(User).where(User.id == assignee.user_id)
-            )
-            user = user_result.scalar_one_or_none()
-            assignee_responses.append(
-                TaskAssigneeResponse(
-                    id=assignee.id,
-                    user_id=assignee.user_id,
-                    user_name=user.full_name if user else None,
-                    user_email=user.email if user else None,
-                    role=assignee.role,
-                )
-            )
-        
-        # Load comments
-        comment_result = await db.execute(
-            select(TaskComment).where(TaskComment.task_id == task.id)
-        )
-        comments = comment_result.scalars().all()
-        
-        comment_responses = []
-        for comment in comments:
-            user_result = await db.execute(
-                select(User).where(User.id == comment.user_id)
-            )
-            user = user_result.scalar_one_or_none()
-            comment_responses.append(
-                TaskCommentResponse(
-                    id=comment.id,
-                    user_id=comment.user_id,
-                    user_name=user.full_name if user else None,
-                    content=comment.content,
-                    mentions=comment.mentions,
-                    created_at=comment.created_at,
-                )
-            )
-        
-        task_dict = TaskResponse.model_validate(task)
-        task_dict.assignees = assignee_responses
-        task_dict.comments = comment_responses
-        task_list.append(task_dict)
-    
-    return task_list
+    # Comments are only embedded on request, otherwise just counted
+    include_fields = {field.strip() for field in (include or "").split(",") if field.strip()}
+    return await hydrate_tasks(db, tasks, include_comments="comments" in include_fields)
 
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
@@ -146,12 +130,22 @@ async def create_task(
         tags=task_data.tag_names or [],
         attachments=[],
         metadata={},
+        # Tasks created already done count towards completions and lead time too
+        completed_at=datetime.now(timezone.utc) if task_data.status == TaskStatus.DONE else None,
     )
     
     db.add(new_task)
     await db.commit()
     await db.refresh(new_task)
     
+    # Schedule the first generated instance of a recurring task
+    if new_task.recurrence:
+        new_task.next_occurrence_at = next_occurrence(
+            new_task.recurrence,
+            new_task.due_date or new_task.created_at,
+            datetime.now(timezone.utc),
+        )
+    
     # Add assignees
     if task_data.assignee_ids:
         for user_id in task_data.assignee_ids:
@@ -181,6 +175,7 @@ async def create_task(
     
     await db.commit()
     await db.refresh(new_task)
+    await invalidate_task_dashboards(db, [new_task.id])
     
     # Load assignees and comments for response
     assignee_result = await db.execute(
@@ -210,71 +205,181 @@ async def create_task(
     return task_response
 
 
-@router.get("/{task_id}", response_model=TaskResponse)
-async def get_task(
-    task_id: int,
+@router.patch("/bulk", response_model=TaskBulkUpdateResponse)
+async def bulk_update_tasks(
+    bulk_data: TaskBulkUpdate,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get a specific task."""
-    result = await db.execute(select(Task).where(Task.id == task_id))
-    task = result.scalar_one_or_none()
+    """Apply the same patch to many tasks with a single set-based UPDATE.
     
-    if not task:
+    Requested ids that match no task are listed in the results as "not_found".
+    """
+    if bulk_data.ids is None and bulk_data.filter is None:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Either ids or filter must be provided"
         )
     
-    # Load assignees
-    assignee_result = await db.execute(
-        select(TaskAssignee).where(TaskAssignee.task_id == task.id)
-    )
-    assignees = assignee_result.scalars().all()
+    patch = bulk_data.patch.dict(exclude_unset=True)
+    assignee_ids = patch.pop("assignee_ids", None)
+    # status and priority are not nullable, an explicit null means "leave as is"
+    for field in ("status", "priority"):
+        if field in patch and patch[field] is None:
+            patch.pop(field)
     
-    assignee_responses = []
-    for assignee in assignees:
-        user_result = await db.execute(
-            select(User).where(User.id == assignee.user_id)
+    if patch.get("project_id"):
+        project_result = await db.execute(
+            select(Project.id).where(Project.id == patch["project_id"])
         )
-        user = user_result.scalar_one_or_none()
-        assignee_responses.append(
-            TaskAssigneeResponse(
-                id=assignee.id,
-                user_id=assignee.user_id,
-                user_name=user.full_name if user else None,
-                user_email=user.email if user else None,
-                role=assignee.role,
+        if project_result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+    
+    # Resolve the target ids
+    if bulk_data.ids is not None:
+        task_ids = list(dict.fromkeys(bulk_data.ids))
+    else:
+        filter_data = bulk_data.filter
+        conditions = []
+        if filter_data.project_id:
+            conditions.append(Task.project_id == filter_data.project_id)
+        if filter_data.status:
+            conditions.append(Task.status == filter_data.status)
+        if filter_data.priority:
+            conditions.append(Task.priority == filter_data.priority)
+        if filter_data.assignee_id:
+            assignee_query = select(TaskAssignee.task_id).where(TaskAssignee.user_id == filter_data.assignee_id)
+            conditions.append(Task.id.in_(assignee_query))
+        if not conditions:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Filter must specify at least one field"
             )
+        
+        ids_result = await db.execute(
+            select(Task.id).where(and_(*conditions)).limit(BULK_UPDATE_MAX_TASKS + 1)
         )
+        task_ids = list(ids_result.scalars().all())
     
-    # Load comments
-    comment_result = await db.execute(
-        select(TaskComment).where(TaskComment.task_id == task.id)
-    )
-    comments = comment_result.scalars().all()
+    if len(task_ids) > BULK_UPDATE_MAX_TASKS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bulk update is limited to {BULK_UPDATE_MAX_TASKS} tasks"
+        )
     
-    comment_responses = []
-    for comment in comments:
-        user_result = await db.execute(
-            select(User).where(User.id == comment.user_id)
+    if not task_ids:
+        return TaskBulkUpdateResponse(updated=0, results=[])
+    
+    # Track completion time for lead-time metrics
+    if "status" in patch:
+        if patch["status"] == TaskStatus.DONE:
+            patch["completed_at"] = func.coalesce(Task.completed_at, func.now())
+        else:
+            patch["completed_at"] = None
+    
+    # One UPDATE ... WHERE id = ANY(:ids) RETURNING for the whole batch
+    update_result = await db.execute(
+        update(Task)
+        .where(Task.id == any_(literal(task_ids, ARRAY(Integer))))
+        .values(updated_at=func.now(), **patch)
+        .returning(
+            Task.id,
+            Task.title,
+            Task.status,
+            Task.priority,
+            Task.project_id,
+            Task.due_date,
+            Task.tags,
+            Task.updated_at,
         )
-        user = user_result.scalar_one_or_none()
-        comment_responses.append(
-            TaskCommentResponse(
-                id=comment.id,
-                user_id=comment.user_id,
-                user_name=user.full_name if user else None,
-                content=comment.content,
-                mentions=comment.mentions,
-                created_at=comment.created_at,
+        .execution_options(synchronize_session=False)
+    )
+    rows = update_result.all()
+    updated_ids = [row.id for row in rows]
+    
+    # Replace assignees with one DELETE and one multi-row INSERT
+    previous_assignee_ids = []
+    if assignee_ids is not None and updated_ids:
+        delete_result = await db.execute(
+            delete(TaskAssignee)
+            .where(TaskAssignee.task_id == any_(literal(updated_ids, ARRAY(Integer))))
+            .returning(TaskAssignee.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        previous_assignee_ids = delete_result.scalars().all()
+        if assignee_ids:
+            await db.execute(
+                insert(TaskAssignee),
+                [
+                    {"task_id": task_id, "user_id": user_id, "role": "assignee"}
+                    for task_id in updated_ids
+                    for user_id in dict.fromkeys(assignee_ids)
+                ],
             )
+    
+    # Fire automations once for the whole batch
+    await AutomationEngine.trigger_batch(
+        "task_updated",
+        [
+            {
+                "id": row.id,
+                "title": row.title,
+                "status": row.status.value,
+                "priority": row.priority.value,
+                "project_id": row.project_id,
+                "tags": row.tags,
+            }
+            for row in rows
+        ],
+        db,
+    )
+    
+    await db.commit()
+    await invalidate_task_dashboards(db, updated_ids, previous_assignee_ids)
+    
+    results = [
+        TaskBulkResult(
+            id=row.id,
+            status=row.status,
+            priority=row.priority,
+            project_id=row.project_id,
+            due_date=row.due_date,
+            updated_at=row.updated_at,
         )
+        for row in rows
+    ]
+    # Explicit ids that matched no task (never existed or deleted meanwhile) are reported, not dropped
+    updated_id_set = set(updated_ids)
+    results.extend(
+        TaskBulkResult(id=task_id, result="not_found")
+        for task_id in task_ids
+        if task_id not in updated_id_set
+    )
     
-    task_response = TaskResponse.model_validate(task)
-    task_response.assignees = assignee_responses
-    task_response.comments = comment_responses
-    return task_response
+    return TaskBulkUpdateResponse(updated=len(rows), results=results)
+
+
+@router.get("/{task_id}", response_model=TaskResponse)
+async def get_task(
+    task_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a specific task."""
+    result = await db.execute(select(Task).where(Task.id == task_id))
+    task = result.scalar_one_or_none()
+    
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    
+    task_responses = await hydrate_tasks(db, [task], include_comments=True)
+    return task_responses[0]
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
@@ -299,57 +404,27 @@ async def update_task(
     for field, value in update_data.items():
         setattr(task, field, value)
     
-    await db.commit()
-    await db.refresh(task)
-    
-    # Load assignees and comments
-    assignee_result = await db.execute(
-        select(TaskAssignee).where(TaskAssignee.task_id == task.id)
-    )
-    assignees = assignee_result.scalars().all()
-    
-    assignee_responses = []
-    for assignee in assignees:
-        user_result = await db.execute(
-            select(User).where(User.id == assignee.user_id)
-        )
-        user = user_result.scalar_one_or_none()
-        assignee_responses.append(
-            TaskAssigneeResponse(
-                id=assignee.id,
-                user_id=assignee.user_id,
-                user_name=user.full_name if user else None,
-                user_email=user.email if user else None,
-                role=assignee.role,
-            )
+    # Track completion time for lead-time metrics
+    if "status" in update_data:
+        if task.status == TaskStatus.DONE:
+            task.completed_at = task.completed_at or datetime.now(timezone.utc)
+        else:
+            task.completed_at = None
+    
+    # Reschedule generated instances when the rule or its anchor changes
+    if "recurrence" in update_data or "due_date" in update_data:
+        task.next_occurrence_at = next_occurrence(
+            task.recurrence,
+            task.due_date or task.created_at,
+            datetime.now(timezone.utc),
         )
     
-    comment_result = await db.execute(
-        select(TaskComment).where(TaskComment.task_id == task.id)
-    )
-    comments = comment_result.scalars().all()
-    
-    comment_responses = []
-    for comment in comments:
-        user_result = await db.execute(
-            select(User).where(User.id == comment.user_id)
-        )
-        user = user_result.scalar_one_or_none()
-        comment_responses.append(
-            TaskCommentResponse(
-                id=comment.id,
-                user_id=comment.user_id,
-                user_name=user.full_name if user else None,
-                content=comment.content,
-                mentions=comment.mentions,
-                created_at=comment.created_at,
-            )
-        )
+    await db.commit()
+    await db.refresh(task)
+    await invalidate_task_dashboards(db, [task.id])
     
-    task_response = TaskResponse.model_validate(task)
-    task_response.assignees = assignee_responses
-    task_response.comments = comment_responses
-    return task_response
+    task_responses = await hydrate_tasks(db, [task], include_comments=True)
+    return task_responses[0]
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -368,12 +443,72 @@ async def delete_task(
             detail="Task not found"
         )
     
+    # Read assignees before the cascade removes them
+    assignee_result = await db.execute(
+        select(TaskAssignee.user_id).where(TaskAssignee.task_id == task.id)
+    )
+    assignee_user_ids = assignee_result.scalars().all()
+    
     await db.delete(task)
     await db.commit()
+    await invalidate_task_dashboards(db, [], assignee_user_ids)
     
     return None
 
 
+@router.get("/{task_id}/comments", response_model=TaskCommentPage)
+async def list_comments(
+    task_id: int,
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """List the comments of a task, oldest first, using keyset pagination on (created_at, id)."""
+    task_result = await db.execute(select(Task.id).where(Task.id == task_id))
+    if task_result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    
+    query = (
+        select(TaskComment, User.full_name)
+        .outerjoin(User, User.id == TaskComment.user_id)
+        .where(TaskComment.task_id == task_id)
+    )
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor, (parse_cursor_datetime, int))
+        query = query.where(
+            tuple_(TaskComment.created_at, TaskComment.id)
+            > tuple_(literal(cursor_created_at), literal(cursor_id))
+        )
+    
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(TaskComment.created_at, TaskComment.id).limit(limit + 1)
+    result = await db.execute(query)
+    rows = result.all()
+    
+    items = [
+        TaskCommentResponse(
+            id=comment.id,
+            user_id=comment.user_id,
+            user_name=full_name,
+            content=comment.content,
+            mentions=comment.mentions,
+            created_at=comment.created_at,
+        )
+        for comment, full_name in rows[:limit]
+    ]
+    
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    return TaskCommentPage(items=items, next_cursor=next_cursor)
+
+
 @router.post("/{task_id}/comments", response_model=TaskCommentResponse)
 async def add_comment(
     task_id: int,
@@ -436,6 +571,7 @@ async def track_time(
     
     await db.commit()
     await db.refresh(task)
+    await invalidate_task_dashboards(db, [task.id])
     
     return {"message": "Time tracked successfully", "total_spent": task.spent}
 
@@ -0,0 +1,127 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, func
+from datetime import date, datetime, time, timedelta, timezone
+from app.core.database import get_db
+from app.core.dependencies import get_current_active_user
+from app.models.user import User, UserRole
+from app.models.task import Task, TaskAssignee, TaskStatus
+from app.models.calendar import Event, EventAttendee, RSVPStatus
+from app.services.timeseries import day_range
+from app.services.workload import meeting_hours, task_hours
+from pydantic import BaseModel
+
+router = APIRouter(prefix="/teams", tags=["teams"])
+
+# Widest window the workload heatmap accepts
+WORKLOAD_MAX_DAYS = 180
+
+
+class WorkloadResponse(BaseModel):
+    """Columnar users x days matrices: row i of each matrix belongs to user_ids[i]."""
+    team: str
+    days: List[date]
+    user_ids: List[int]
+    user_names: List[Optional[str]]
+    meeting_hours: List[List[float]]
+    task_hours: List[List[float]]
+
+
+@router.get("/{team}/workload", response_model=WorkloadResponse)
+async def get_team_workload(
+    team: str,
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get committed hours per team member and UTC day, from meetings and task estimates."""
+    if current_user.team != team and current_user.role not in (UserRole.MANAGER, UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to team"
+        )
+
+    today = datetime.now(timezone.utc).date()
+    start = start or today
+    end = end or start + timedelta(days=13)
+    days = (end - start).days + 1
+    if days < 1 or days > WORKLOAD_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range must be ordered and at most {WORKLOAD_MAX_DAYS} days"
+        )
+
+    window_start = datetime.combine(start, time.min, tzinfo=timezone.utc)
+    window_end = window_start + timedelta(days=days)
+
+    # Query 1: team members, each with the meetings overlapping the window (if any)
+    meetings = (
+        select(EventAttendee.user_id, Event.start, Event.end)
+        .join(Event, Event.id == EventAttendee.event_id)
+        .where(
+            and_(
+                EventAttendee.rsvp_status != RSVPStatus.DECLINED,
+                Event.start < window_end,
+                Event.end > window_start,
+                Event.all_day == False,
+            )
+        )
+        .subquery()
+    )
+    member_result = await db.execute(
+        select(User.id, User.full_name, meetings.c.start, meetings.c.end)
+        .outerjoin(meetings, meetings.c.user_id == User.id)
+        .where(User.team == team, User.is_active == True)
+        .order_by(User.id)
+    )
+
+    user_ids: List[int] = []
+    user_names: List[Optional[str]] = []
+    row_of = {}
+    intervals = []
+    for user_id, full_name, meeting_start, meeting_end in member_result.all():
+        if user_id not in row_of:
+            row_of[user_id] = len(user_ids)
+            user_ids.append(user_id)
+            user_names.append(full_name)
+        if meeting_start is not None:
+            intervals.append((row_of[user_id], meeting_start, meeting_end))
+
+    # Query 2: remaining estimates of open tasks assigned to members; overdue ones are still owed
+    task_rows = []
+    if user_ids:
+        task_result = await db.execute(
+            select(
+                TaskAssignee.user_id,
+                Task.created_at,
+                Task.due_date,
+                func.greatest(Task.estimate - Task.spent, 0.0),
+            )
+            .join(Task, Task.id == TaskAssignee.task_id)
+            .where(
+                TaskAssignee.user_id.in_(user_ids),
+                Task.status != TaskStatus.DONE,
+                Task.estimate.isnot(None),
+                Task.due_date.isnot(None),
+            )
+        )
+        for user_id, created_at, due_date, remaining in task_result.all():
+            if not remaining:
+                continue
+            first_day = (created_at or window_start).astimezone(timezone.utc).date()
+            due_day = due_date.astimezone(timezone.utc).date()
+            task_rows.append((row_of[user_id], first_day, due_day, float(remaining)))
+
+    meetings_matrix = meeting_hours(start, days, len(user_ids), intervals)
+    tasks_matrix = task_hours(start, days, len(user_ids), task_rows, today)
+
+    return WorkloadResponse(
+        team=team,
+        days=day_range(start, end),
+        user_ids=user_ids,
+        user_names=user_names,
+        meeting_hours=meetings_matrix.round(2).tolist(),
+        task_hours=tasks_matrix.round(2).tolist(),
+    )
@@ -0,0 +1,92 @@
+"""
+Redis-backed cache helpers
+
+All operations degrade to cache misses when Redis is unreachable, so callers
+always fall back to the database instead of failing the request.
+"""
+from typing import Any, Optional
+import json
+import logging
+import time
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds to skip Redis after a connection error, so an outage costs one timeout, not one per request
+_BACKOFF_SECONDS = 5.0
+
+_client: Optional[redis.Redis] = None
+_unavailable_until = 0.0
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Return the shared Redis client, or None while Redis is backed off."""
+    global _client
+    if time.monotonic() < _unavailable_until:
+        return None
+    if _client is None:
+        _client = redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.CACHE_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT,
+            decode_responses=True,
+        )
+    return _client
+
+
+def _mark_unavailable(error: Exception) -> None:
+    global _unavailable_until
+    _unavailable_until = time.monotonic() + _BACKOFF_SECONDS
+    logger.warning(f"Redis unavailable, bypassing cache for {_BACKOFF_SECONDS}s: {error}")
+
+
+async def cache_get_json(key: str) -> Optional[Any]:
+    """Get a JSON value from the cache, None on miss or error."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(key)
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return None
+    return json.loads(raw) if raw is not None else None
+
+
+async def cache_set_json(key: str, value: Any, ttl: int) -> None:
+    """Store a JSON-serializable value with a TTL in seconds."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.set(key, json.dumps(value, default=str), ex=ttl)
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+
+
+async def cache_delete(*keys: str) -> None:
+    """Delete keys from the cache."""
+    if not keys:
+        return
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.delete(*keys)
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+
+
+async def redis_available() -> bool:
+    """Ping Redis, within the cache socket timeout; False while it is backed off."""
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        await client.ping()
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return False
+    return True
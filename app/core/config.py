@@ -24,11 +24,51 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    CACHE_SOCKET_TIMEOUT: float = float(os.getenv("CACHE_SOCKET_TIMEOUT", "0.1"))  # Seconds
+    
+    # Dashboard
+    DASHBOARD_CACHE_TTL: int = int(os.getenv("DASHBOARD_CACHE_TTL", "30"))  # Seconds
+    RESOURCE_HOURS_PER_DAY: float = float(os.getenv("RESOURCE_HOURS_PER_DAY", "8"))  # Bookable hours for utilization
+    
+    # Search
+    SEARCH_BACKEND: str = os.getenv("SEARCH_BACKEND", "postgres")  # "postgres", or "memory" for single-process local/test runs
+    SEARCH_MIN_RESULTS: int = int(os.getenv("SEARCH_MIN_RESULTS", "5"))  # Full-text hits below which the trigram fallback runs
+    SEARCH_SIMILARITY_THRESHOLD: float = float(os.getenv("SEARCH_SIMILARITY_THRESHOLD", "0.3"))  # pg_trgm word similarity
+    SUGGEST_CACHE_SIZE: int = int(os.getenv("SUGGEST_CACHE_SIZE", "10000"))  # Cached (user, prefix) entries per process
+    SUGGEST_CACHE_TTL: float = float(os.getenv("SUGGEST_CACHE_TTL", "30"))  # Seconds
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))  # bcrypt threads per process; 0 runs on the event loop
+    PASSWORD_QUEUE_TIMEOUT: float = float(os.getenv("PASSWORD_QUEUE_TIMEOUT", "5"))  # Seconds to wait for a free worker
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))  # Verified JWTs kept per process, until their exp
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))  # Cached users per process
+    PRINCIPAL_CACHE_TTL: float = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))  # Seconds; bounds staleness across workers
+    PRINCIPAL_CACHE_REDIS: bool = os.getenv("PRINCIPAL_CACHE_REDIS", "false").lower() == "true"  # Share entries via Redis
+    
+    # Rate limiting (requests per minute; each policy also allows a burst of that size)
+    RATE_LIMIT_LOGIN_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_LOGIN_PER_MINUTE", "10"))  # Per client address
+    RATE_LIMIT_REGISTER_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_REGISTER_PER_MINUTE", "5"))  # Per client address
+    RATE_LIMIT_WRITE_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_WRITE_PER_MINUTE", "120"))  # Per user, else per address
+    RATE_LIMIT_READ_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_READ_PER_MINUTE", "600"))  # Per user, else per address
+    RATE_LIMIT_LOCAL_KEYS: int = int(os.getenv("RATE_LIMIT_LOCAL_KEYS", "100000"))  # Fallback keys per process while Redis is down
+    
+    # Audit
+    AUDIT_QUEUE_SIZE: int = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))  # Records waiting to be written, per process
+    AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", "500"))  # Rows per INSERT; keep rows * 9 under 32767 parameters
+    AUDIT_FLUSH_INTERVAL_MS: int = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "200"))  # Max delay before a partial batch is written
+    AUDIT_PARTITIONS_AHEAD: int = int(os.getenv("AUDIT_PARTITIONS_AHEAD", "2"))  # Monthly partitions created beyond the current one
+    AUDIT_RETENTION_MONTHS: int = int(os.getenv("AUDIT_RETENTION_MONTHS", "12"))  # Full months kept in the database
+    AUDIT_ARCHIVE_DIR: str = os.getenv("AUDIT_ARCHIVE_DIR", "archive/audit_logs")  # gzip JSONL files of dropped partitions
+    AUDIT_RECENT_DAYS: int = int(os.getenv("AUDIT_RECENT_DAYS", "30"))  # Default window of GET /security/audit-logs
+    AUDIT_OVERFLOW: str = os.getenv("AUDIT_OVERFLOW", "block")  # "block", "drop_newest" or "drop_oldest" when the queue is full
+    
+    # GDPR exports
+    GDPR_EXPORT_DIR: str = os.getenv("GDPR_EXPORT_DIR", "exports")  # Finished zip archives, shared by workers and API
+    GDPR_EXPORT_TTL_HOURS: int = int(os.getenv("GDPR_EXPORT_TTL_HOURS", "72"))  # Archives are deleted after this
+    GDPR_EXPORT_TIMEOUT_MINUTES: int = int(os.getenv("GDPR_EXPORT_TIMEOUT_MINUTES", "120"))  # Unfinished exports with no worker heartbeat for this long are failed
     
     # CORS - defined but not read from env (we parse manually)
     CORS_ORIGINS: List[str] = []
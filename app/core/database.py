@@ -1,5 +1,6 @@
+from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import declarative_base, sessionmaker
 from app.core.config import settings
 
 # Create async engine
@@ -18,6 +19,20 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Synchronous engine for Celery workers (psycopg2 driver, like Alembic)
+sync_engine = create_engine(
+    settings.DATABASE_URL.replace("+asyncpg", ""),
+    future=True,
+    pool_pre_ping=True,
+)
+
+# Sync session factory for Celery workers
+SyncSessionLocal = sessionmaker(
+    sync_engine,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
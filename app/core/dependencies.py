@@ -1,9 +1,9 @@
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from app.core.database import get_db
+from app.core.principal import get_principal
 from app.core.security import decode_access_token
 from app.models.user import User, UserRole
 
@@ -11,13 +11,11 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    """Get current authenticated user from JWT token."""
-    import logging
-    logger = logging.getLogger(__name__)
-    
+    """Get current authenticated user from JWT token, served from the principal cache."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -25,32 +23,27 @@ async def get_current_user(
     )
     
     if not token:
-        logger.warning("Nessun token ricevuto")
         raise credentials_exception
     
-    logger.info(f"Token ricevuto (primi 50 caratteri): {token[:50]}...")
-    logger.info(f"Lunghezza token: {len(token)}")
-    
-    payload = decode_access_token(token)
+    # TokenClaimsMiddleware has already verified the token; decode only when it did not run
+    if hasattr(request.state, "token_claims"):
+        payload = request.state.token_claims
+    else:
+        payload = decode_access_token(token)
     if payload is None:
-        logger.warning("Token decodificazione fallita - verificare SECRET_KEY e formato token")
         raise credentials_exception
     
-    logger.info(f"Payload decodificato: {payload}")
-    
     user_id_raw = payload.get("sub")
     if user_id_raw is None:
-        logger.warning("user_id non trovato nel payload")
         raise credentials_exception
     
     # Convert to int if it's a string (JWT standard allows both)
     user_id: int = int(user_id_raw) if isinstance(user_id_raw, str) else user_id_raw
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    # Cached snapshot of the user row; detached, so changes must go through an UPDATE
+    user = await get_principal(db, user_id)
     
     if user is None:
-        logger.warning(f"Utente con id {user_id} non trovato")
         raise credentials_exception
     
     if not user.is_active:
@@ -0,0 +1,40 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+from typing import Any, Callable, List, Sequence
+from datetime import datetime
+from fastapi import HTTPException, status
+import base64
+import json
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last returned row into an opaque cursor."""
+    serialized = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(serialized, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[Callable[[Any], Any]]) -> List[Any]:
+    """Decode a cursor produced by encode_cursor, converting each value with types.
+
+    Pass int, float, str or parse_cursor_datetime per sort key, e.g.
+    decode_cursor(cursor, (parse_cursor_datetime, int)). Raises a 400 if the
+    cursor is malformed or a value does not convert.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong number of cursor values")
+        return [convert(value) for convert, value in zip(types, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def parse_cursor_datetime(value: Any) -> datetime:
+    """Parse a datetime component of a cursor; raises ValueError or TypeError if it is not one."""
+    return datetime.fromisoformat(value)
@@ -0,0 +1,70 @@
+"""
+Bounded executor for password hashing
+
+bcrypt is deliberately slow (~250 ms per call) and releases the GIL, so it runs
+on a small dedicated thread pool instead of the event loop. A semaphore in
+front of the pool bounds concurrency; callers that wait longer than the queue
+timeout get PasswordPoolBusy instead of piling up behind a login storm.
+"""
+from typing import Any, Callable, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+from app.core.config import settings
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when a password operation waited longer than the queue timeout."""
+
+
+class PasswordPool:
+    """Run password hashing on `workers` threads; `workers` <= 0 runs it inline on the event loop."""
+
+    def __init__(self, workers: int, queue_timeout: float):
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password") if workers > 0 else None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        # Counters exposed by stats()
+        self.queued = 0
+        self.peak_queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._executor is None:
+            return func(*args)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise PasswordPoolBusy(f"No password worker free within {self.queue_timeout}s")
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_pool = PasswordPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_QUEUE_TIMEOUT)
@@ -0,0 +1,113 @@
+"""
+Authenticated-principal cache
+
+Keeps the user fields endpoints read from `current_user` in a process-local
+TTL LRU, optionally shared through Redis, so authenticating a request does not
+query the users table. Entries are dropped when a committed write changes one
+of those fields; other worker processes see the change within
+PRINCIPAL_CACHE_TTL seconds.
+"""
+from typing import Any, Dict, Optional, Set
+from datetime import datetime
+import asyncio
+from sqlalchemy import select, event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.cache import cache_get_json, cache_set_json, cache_delete
+from app.core.config import settings
+from app.core.lru import TTLCache
+from app.models.user import User, UserRole
+
+# Columns copied into the cache; everything endpoints read from current_user
+PRINCIPAL_FIELDS = ("id", "email", "full_name", "role", "team", "timezone", "preferences", "is_active", "created_at")
+
+_local = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL)
+
+# Redis deletes scheduled from commit hooks; the event loop only keeps weak references to tasks
+_pending_deletes: Set[asyncio.Task] = set()
+
+
+def principal_key(user_id: int) -> str:
+    return f"principal:{user_id}"
+
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    """JSON-serializable copy of the cached fields."""
+    data = {field: getattr(user, field) for field in PRINCIPAL_FIELDS}
+    data["role"] = user.role.value if user.role is not None else None
+    data["created_at"] = user.created_at.isoformat() if user.created_at else None
+    return data
+
+
+def _to_user(data: Dict[str, Any]) -> User:
+    """Detached User carrying the cached fields; not attached to any session."""
+    fields = dict(data)
+    fields["role"] = UserRole(fields["role"]) if fields["role"] is not None else None
+    fields["created_at"] = datetime.fromisoformat(fields["created_at"]) if fields["created_at"] else None
+    return User(**fields)
+
+
+async def get_principal(db: AsyncSession, user_id: int) -> Optional[User]:
+    """Return the user for an authenticated request, from the cache when possible."""
+    data = _local.get(user_id)
+    if data is None and settings.PRINCIPAL_CACHE_REDIS:
+        data = await cache_get_json(principal_key(user_id))
+        if data is not None:
+            _local.set(user_id, data)
+
+    if data is None:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+        data = _snapshot(user)
+        _local.set(user_id, data)
+        if settings.PRINCIPAL_CACHE_REDIS:
+            await cache_set_json(principal_key(user_id), data, int(settings.PRINCIPAL_CACHE_TTL))
+
+    return _to_user(data)
+
+
+async def invalidate_principal(user_id: int) -> None:
+    """Drop a user's cached principal, locally and in Redis."""
+    _local.delete(user_id)
+    if settings.PRINCIPAL_CACHE_REDIS:
+        await cache_delete(principal_key(user_id))
+
+
+_PENDING_KEY = "principal_invalidations"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_principal_changes(session: Session, flush_context) -> None:
+    """Remember users whose cached fields this flush changed or deleted."""
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for instance in session.dirty:
+        if isinstance(instance, User):
+            state = inspect(instance)
+            if any(state.attrs[field].history.has_changes() for field in PRINCIPAL_FIELDS):
+                pending.add(instance.id)
+    for instance in session.deleted:
+        if isinstance(instance, User):
+            pending.add(inspect(instance).identity[0])
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_principal_changes(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_KEY, set())
+    for user_id in user_ids:
+        _local.delete(user_id)
+    if user_ids and settings.PRINCIPAL_CACHE_REDIS:
+        # Commit hooks are synchronous; the Redis delete runs right after on the event loop
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(cache_delete(*[principal_key(user_id) for user_id in user_ids]))
+        _pending_deletes.add(task)
+        task.add_done_callback(_pending_deletes.discard)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_principal_changes(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
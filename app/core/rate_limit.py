@@ -0,0 +1,93 @@
+"""
+GCRA rate limiting
+
+The generic cell rate algorithm keeps one number per key, the theoretical
+arrival time (TAT) of the next request. A request is allowed when it arrives
+no earlier than TAT minus the burst tolerance, and then pushes TAT forward by
+one emission interval (period / limit). The state lives in Redis, updated by
+an atomic Lua script so every worker and pod shares the same budget. While
+Redis is unreachable, an in-process TTL LRU holds the same state per worker.
+"""
+from typing import NamedTuple
+import logging
+import math
+import time
+from redis.exceptions import RedisError
+from app.core.cache import get_redis, _mark_unavailable
+from app.core.config import settings
+from app.core.lru import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitPolicy(NamedTuple):
+    name: str
+    limit: int  # Requests allowed per period, all of which may arrive as one burst
+    period: float  # Seconds
+    per_user: bool  # Key by authenticated user when there is one, else by client address
+
+    @property
+    def emission_interval(self) -> float:
+        return self.period / self.limit
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float  # Seconds until the next request would be allowed; 0 when allowed
+
+
+# KEYS[1] = TAT key; ARGV = emission interval and burst tolerance in ms. Uses Redis time so worker clocks don't matter
+_GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + emission
+local allow_at = new_tat - tolerance
+if now < allow_at then
+    return {0, 0, math.ceil(allow_at - now)}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now - allow_at) / emission), 0}
+"""
+
+_script = None
+
+# Fallback state: key -> TAT on the monotonic clock, dropped once it is in the past
+_local = TTLCache(settings.RATE_LIMIT_LOCAL_KEYS, 60.0)
+
+
+def _check_local(key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+    emission = policy.emission_interval
+    now = time.monotonic()
+    tat = max(_local.get(key, now), now)
+    new_tat = tat + emission
+    allow_at = new_tat - policy.period
+    if now < allow_at:
+        return RateLimitDecision(False, 0, allow_at - now)
+    # An entry whose TAT has passed means the same as no entry, so it can expire then
+    _local.set(key, new_tat, ttl=new_tat - now)
+    return RateLimitDecision(True, math.floor((now - allow_at) / emission), 0.0)
+
+
+async def check_rate_limit(key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+    """Count one request against key under policy."""
+    global _script
+    client = get_redis()
+    if client is not None:
+        if _script is None:
+            _script = client.register_script(_GCRA_SCRIPT)
+        try:
+            allowed, remaining, retry_after_ms = await _script(
+                keys=[f"ratelimit:{policy.name}:{key}"],
+                args=[policy.emission_interval * 1000.0, policy.period * 1000.0],
+            )
+            return RateLimitDecision(bool(allowed), int(remaining), int(retry_after_ms) / 1000.0)
+        except (RedisError, OSError) as e:
+            _mark_unavailable(e)
+    return _check_local(f"{policy.name}:{key}", policy)
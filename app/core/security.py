@@ -3,7 +3,13 @@ from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 import hashlib
+import logging
+import time
 from app.core.config import settings
+from app.core.lru import TTLCache
+from app.core.password_pool import password_pool
+
+logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -31,47 +37,46 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password pool, off the event loop. May raise PasswordPoolBusy."""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password pool, off the event loop. May raise PasswordPoolBusy."""
+    return await password_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
-    import logging
-    logger = logging.getLogger(__name__)
-    
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    logger.info(f"Creazione token con data: {to_encode}, SECRET_KEY: {settings.SECRET_KEY[:20]}..., ALGORITHM: {settings.ALGORITHM}")
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    logger.info(f"Token creato (primi 50 caratteri): {encoded_jwt[:50]}...")
     return encoded_jwt
 
 
+# Verified claims by token hash; an entry lives until its token's exp, never longer
+_verified_tokens = TTLCache(settings.TOKEN_CACHE_SIZE, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token."""
-    import logging
-    logger = logging.getLogger(__name__)
+    """Decode and verify a JWT token, reusing the result of an earlier verification."""
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = _verified_tokens.get(key)
+    if payload is not None:
+        return payload
     
     try:
-        logger.info(f"Tentativo di decodifica token con SECRET_KEY: {settings.SECRET_KEY[:20]}...")
-        logger.info(f"ALGORITHM: {settings.ALGORITHM}")
-        
-        # Try to decode without verification first (for debugging)
-        try:
-            unverified = jwt.decode(token, options={"verify_signature": False})
-            logger.info(f"Token decodificato senza verifica: {unverified}")
-        except Exception as e:
-            logger.error(f"Errore nella decodifica senza verifica: {e}")
-        
-        # Now decode with verification
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        logger.info(f"Token decodificato con successo: {payload}")
-        return payload
     except JWTError as e:
-        logger.error(f"Errore JWT durante decodifica: {type(e).__name__}: {e}")
+        logger.debug(f"Rejected access token: {type(e).__name__}")
         return None
-    except Exception as e:
-        logger.error(f"Errore generico durante decodifica: {type(e).__name__}: {e}")
-        return None
-
+    
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        _verified_tokens.set(key, payload, ttl=expires_in)
+    return payload
@@ -3,9 +3,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import structlog
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, Base, AsyncSessionLocal
+from app.core.password_pool import password_pool
 from app.middleware.audit import AuditMiddleware
+from app.middleware.authentication import TokenClaimsMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.search_backend import get_search_backend
+from app.services.audit_writer import audit_writer
 
 # Configure structured logging
 structlog.configure(
@@ -46,12 +50,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Rate limiting middleware
-app.add_middleware(RateLimitMiddleware, requests_per_minute=60)
+# Rate limiting middleware; policies in app/middleware/rate_limit.py
+app.add_middleware(RateLimitMiddleware)
 
 # Audit logging middleware
 app.add_middleware(AuditMiddleware)
 
+# Token verification; added last so it runs first and the middleware above can read the claims
+app.add_middleware(TokenClaimsMiddleware)
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -59,12 +66,19 @@ async def startup_event():
     logger.info("Starting up Planora API")
     # Database tables are created via Alembic migrations
     # No need to create_all here in production
+    
+    # The in-memory search backend starts empty; Postgres reads its indexes directly
+    search_backend = get_search_backend()
+    async with AsyncSessionLocal() as db:
+        await search_backend.rebuild(db)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down Planora API")
+    # Write audit records still queued before the process exits
+    await audit_writer.stop()
 
 
 @app.get("/health")
@@ -75,6 +89,8 @@ async def health_check():
             "status": "healthy",
             "service": settings.PROJECT_NAME,
             "version": settings.VERSION,
+            "password_pool": password_pool.stats(),
+            "audit_writer": audit_writer.stats(),
         }
     )
 
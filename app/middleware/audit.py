@@ -1,67 +1,79 @@
 """
 Audit logging middleware
 """
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import AsyncSessionLocal
-from app.models.audit import AuditLog, AuditAction
-from app.core.security import decode_access_token
-import json
-import time
+from starlette.types import ASGIApp, Receive, Scope, Send
+from datetime import datetime, timezone
+from app.models.audit import AuditAction
+from app.services.audit_diff import AuditContext, audit_context
+from app.services.audit_writer import audit_writer
 
+SKIPPED_PATHS = {"/health", "/", "/api/docs", "/api/openapi.json"}
 
-class AuditMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all API requests for audit purposes."""
+
+class AuditMiddleware:
+    """Middleware to log all API requests for audit purposes.
+    
+    Pure ASGI: the request is audited from its scope and headers only, and
+    neither body is read or buffered.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Skip audit for health checks and static files
-        if request.url.path in ["/health", "/", "/api/docs", "/api/openapi.json"]:
-            return await call_next(request)
+        if scope["type"] != "http" or scope["path"] in SKIPPED_PATHS:
+            await self.app(scope, receive, send)
+            return
         
-        start_time = time.time()
-        
-        # Get user from token if available
+        # Get user from the claims TokenClaimsMiddleware verified, if any
         user_id = None
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            payload = decode_access_token(token)
-            if payload:
-                user_id = payload.get("sub")
+        claims = scope.get("state", {}).get("token_claims")
+        if claims and claims.get("sub") is not None:
+            user_id = int(claims["sub"])
+        
+        # ORM writes made while handling the request are audited with field diffs under this context
+        context = None
+        if user_id:
+            user_agent = None
+            for name, value in scope["headers"]:
+                if name == b"user-agent":
+                    user_agent = value.decode("latin-1")
+                    break
+            client = scope.get("client")
+            context = AuditContext(user_id, client[0] if client else None, user_agent)
+        token = audit_context.set(context)
+        
+        # Process request; returns once the response has been sent
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            audit_context.reset(token)
         
-        # Process request
-        response = await call_next(request)
+        method = scope["method"]
+        path = scope["path"]
         
-        # Determine action type from method and path
-        action = self._determine_action(request.method, request.url.path)
+        if context is None:
+            return
         
-        # Log audit entry for write operations
-        if request.method in ["POST", "PUT", "PATCH", "DELETE"] and user_id:
-            try:
-                from app.core.database import AsyncSessionLocal
-                async with AsyncSessionLocal() as db:
-                    # Extract entity info from path
-                    entity_type, entity_id = self._extract_entity_info(request.url.path)
-                    
-                    if entity_type:
-                        audit_log = AuditLog(
-                            entity_type=entity_type,
-                            entity_id=entity_id or 0,
-                            action=action,
-                            user_id=user_id,
-                            diff={},
-                            ip_address=request.client.host if request.client else None,
-                            user_agent=request.headers.get("user-agent"),
-                        )
-                        db.add(audit_log)
-                        await db.commit()
-            except Exception as e:
-                # Don't fail request if audit logging fails
-                import logging
-                logging.error(f"Audit logging error: {e}")
+        # Field-level records committed by the ORM hooks; awaiting submit() applies the writer's backpressure
+        for record in context.records:
+            await audit_writer.submit(record)
         
-        return response
+        # Write requests that changed no audited model still get a request-level entry
+        if method in ("POST", "PUT", "PATCH", "DELETE") and not context.records:
+            entity_type, entity_id = self._extract_entity_info(path)
+            if entity_type:
+                await audit_writer.submit({
+                    "entity_type": entity_type,
+                    "entity_id": entity_id or 0,
+                    "action": self._determine_action(method, path),
+                    "user_id": user_id,
+                    "timestamp": datetime.now(timezone.utc),
+                    "diff": {},
+                    "ip_address": context.ip_address,
+                    "user_agent": context.user_agent,
+                })
     
     def _determine_action(self, method: str, path: str) -> AuditAction:
         """Determine audit action from HTTP method."""
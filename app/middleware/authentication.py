@@ -0,0 +1,28 @@
+"""
+Bearer token verification middleware
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.security import decode_access_token
+
+
+class TokenClaimsMiddleware:
+    """Verify the bearer token once and store its claims on request.state.token_claims.
+
+    The claims are None when the request has no valid token. Rejecting the
+    request is left to the endpoint dependencies.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            claims = None
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    scheme, _, token = value.decode("latin-1").partition(" ")
+                    if scheme.lower() == "bearer" and token:
+                        claims = decode_access_token(token)
+                    break
+            scope.setdefault("state", {})["token_claims"] = claims
+        await self.app(scope, receive, send)
@@ -1,43 +1,89 @@
 """
 Rate limiting middleware
 """
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from collections import defaultdict
-import time
-from typing import Dict, Tuple
+from typing import Optional
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import math
+from app.core.config import settings
+from app.core.rate_limit import RateLimitPolicy, check_rate_limit
 
+LOGIN_POLICY = RateLimitPolicy("login", settings.RATE_LIMIT_LOGIN_PER_MINUTE, 60.0, per_user=False)
+REGISTER_POLICY = RateLimitPolicy("register", settings.RATE_LIMIT_REGISTER_PER_MINUTE, 60.0, per_user=False)
+WRITE_POLICY = RateLimitPolicy("write", settings.RATE_LIMIT_WRITE_PER_MINUTE, 60.0, per_user=True)
+READ_POLICY = RateLimitPolicy("read", settings.RATE_LIMIT_READ_PER_MINUTE, 60.0, per_user=True)
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple in-memory rate limiting middleware."""
+# (method, path) pairs with their own policy; everything else is a read or a write
+ROUTE_POLICIES = {
+    ("POST", "/api/v1/auth/login"): LOGIN_POLICY,
+    ("POST", "/api/v1/auth/register"): REGISTER_POLICY,
+}
+
+EXEMPT_PATHS = {"/health", "/", "/api/docs", "/api/redoc", "/api/openapi.json"}
+
+
+def policy_for(method: str, path: str) -> Optional[RateLimitPolicy]:
+    """The policy a request counts against, or None if it is not limited."""
+    if path in EXEMPT_PATHS or method == "OPTIONS":
+        return None
+    policy = ROUTE_POLICIES.get((method, path))
+    if policy is not None:
+        return policy
+    return READ_POLICY if method in ("GET", "HEAD") else WRITE_POLICY
+
+
+class RateLimitMiddleware:
+    """Per-route GCRA rate limiting, shared across workers through Redis.
     
-    def __init__(self, app, requests_per_minute: int = 60):
-        super().__init__(app)
-        self.requests_per_minute = requests_per_minute
-        self.requests: Dict[str, list] = defaultdict(list)
+    Pure ASGI: only the scope is inspected and the X-RateLimit headers are
+    added to the response start message, so bodies stream through untouched.
+    """
     
-    async def dispatch(self, request: Request, call_next):
-        # Get client identifier
-        client_id = request.client.host if request.client else "unknown"
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        policy = policy_for(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
         
-        # Clean old requests
-        current_time = time.time()
-        self.requests[client_id] = [
-            req_time for req_time in self.requests[client_id]
-            if current_time - req_time < 60
-        ]
+        # Authenticated callers get their own budget; TokenClaimsMiddleware has verified the token
+        claims = scope.get("state", {}).get("token_claims")
+        if policy.per_user and claims and claims.get("sub") is not None:
+            key = f"user:{claims['sub']}"
+        else:
+            client = scope.get("client")
+            key = f"ip:{client[0] if client else 'unknown'}"
         
-        # Check rate limit
-        if len(self.requests[client_id]) >= self.requests_per_minute:
-            raise HTTPException(
+        decision = await check_rate_limit(key, policy)
+        if not decision.allowed:
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded. Please try again later."
+                content={"detail": "Rate limit exceeded. Please try again later."},
+                headers={
+                    "Retry-After": str(max(1, math.ceil(decision.retry_after))),
+                    "X-RateLimit-Limit": str(policy.limit),
+                    "X-RateLimit-Remaining": "0",
+                },
             )
+            await response(scope, receive, send)
+            return
         
-        # Record request
-        self.requests[client_id].append(current_time)
+        limit = str(policy.limit)
+        remaining = str(decision.remaining)
         
-        # Process request
-        response = await call_next(request)
-        return response
-
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-RateLimit-Limit", limit)
+                headers.append("X-RateLimit-Remaining", remaining)
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
@@ -7,6 +7,8 @@ from app.models.notification import Notification
 from app.models.audit import AuditLog
 from app.models.automation import AutomationRule
 from app.models.integration import Integration
+from app.models.metrics import TeamDailyMetrics, ResourceDailyBooking, ProjectDailySnapshot
+from app.models.gdpr import DataExport
 
 __all__ = [
     "User",
@@ -26,5 +28,9 @@ __all__ = [
     "AuditLog",
     "AutomationRule",
     "Integration",
+    "TeamDailyMetrics",
+    "ResourceDailyBooking",
+    "ProjectDailySnapshot",
+    "DataExport",
 ]
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Enum, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -19,13 +19,23 @@ class AuditAction(str, enum.Enum):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Keyset pages on (timestamp, id): overall, per user and per entity. action is carried
+        # in the index so filtering on it doesn't need the heap
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id", postgresql_include=["action"]),
+        Index("ix_audit_logs_user_timeline", "user_id", "timestamp", "id", postgresql_include=["action"]),
+        Index("ix_audit_logs_entity_timeline", "entity_type", "entity_id", "timestamp", "id", postgresql_include=["action"]),
+        # Monthly partitions, managed by app.services.audit_partitions
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    entity_type = Column(String, nullable=False, index=True)  # e.g., "event", "task", "calendar"
-    entity_id = Column(Integer, nullable=False, index=True)
+    # The partition key has to be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String, nullable=False)  # e.g., "event", "task", "calendar"
+    entity_id = Column(Integer, nullable=False)
     action = Column(Enum(AuditAction), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     diff = Column(JSON, default=dict, nullable=False)  # Changes made
     ip_address = Column(String, nullable=True)
     user_agent = Column(String, nullable=True)
@@ -33,3 +43,10 @@ class AuditLog(Base):
     # Relationships
     user = relationship("User", back_populates="audit_logs")
 
+
+
+@event.listens_for(AuditLog.__table__, "after_create")
+def _create_initial_partitions(target, connection, **kw):
+    """metadata.create_all (tests, scratch schemas) also gets partitions to write into."""
+    from app.services.audit_partitions import create_initial_partitions
+    create_initial_partitions(connection)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, JSON, Enum
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, JSON, Enum, Index, Computed, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 import enum
 from app.core.database import Base
@@ -56,6 +56,11 @@ class Calendar(Base):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_events_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_events_title_prefix", text('lower(title) COLLATE "C"')),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     calendar_id = Column(Integer, ForeignKey("calendars.id"), nullable=False)
@@ -72,6 +77,15 @@ class Event(Base):
     attachments = Column(JSON, default=list, nullable=False)
     event_metadata = Column("metadata", JSON, default=dict, nullable=False)  # For event type, subtype, etc.
     timezone = Column(String, default="UTC", nullable=False)
+    # Weighted full-text document (title A, description B), maintained by PostgreSQL
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('italian'::regconfig, coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('italian'::regconfig, coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, JSON, BigInteger, Index
+from sqlalchemy.sql import func
+import enum
+from app.core.database import Base
+
+
+class DataExportStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class DataExport(Base):
+    """A GDPR data export, written to a zip of JSONL files by the export_user_data_archive job."""
+    __tablename__ = "data_exports"
+    __table_args__ = (
+        Index("ix_data_exports_user_id_created_at", "user_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    status = Column(Enum(DataExportStatus), default=DataExportStatus.PENDING, nullable=False)
+    progress = Column(JSON, default=dict, nullable=False)  # Rows written per section so far
+    file_path = Column(String, nullable=True)
+    file_size = Column(BigInteger, nullable=True)  # Bytes
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # Set by the worker when it starts and after each section
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)  # The file is deleted after this
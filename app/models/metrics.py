@@ -0,0 +1,55 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Float, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class TeamDailyMetrics(Base):
+    """Per-team daily task counters, maintained by the refresh_team_metrics job."""
+    __tablename__ = "team_daily_metrics"
+    __table_args__ = (
+        UniqueConstraint("team", "day", name="uq_team_daily_metrics_team_day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    team = Column(String, nullable=False)
+    day = Column(Date, nullable=False)  # UTC day
+    tasks_created = Column(Integer, default=0, nullable=False)
+    tasks_completed = Column(Integer, default=0, nullable=False)
+    lead_time_hours_sum = Column(Float, default=0.0, nullable=False)  # Sum of created -> completed hours
+    active_tasks = Column(Integer, nullable=True)  # Open tasks snapshot, only set on the current day
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ResourceDailyBooking(Base):
+    """Hours booked on a resource calendar per team and day, maintained by refresh_team_metrics."""
+    __tablename__ = "resource_daily_bookings"
+    __table_args__ = (
+        UniqueConstraint("resource_id", "team", "day", name="uq_resource_daily_bookings_resource_team_day"),
+        Index("ix_resource_daily_bookings_team_day", "team", "day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    resource_id = Column(Integer, ForeignKey("resources.id"), nullable=False)
+    team = Column(String, nullable=False)
+    day = Column(Date, nullable=False)  # UTC day
+    booked_hours = Column(Float, default=0.0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ProjectDailySnapshot(Base):
+    """End-of-day task state of a project, written by the snapshot_project_metrics job."""
+    __tablename__ = "project_daily_snapshots"
+    __table_args__ = (
+        UniqueConstraint("project_id", "day", name="uq_project_daily_snapshots_project_day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    day = Column(Date, nullable=False)  # UTC day
+    todo_count = Column(Integer, default=0, nullable=False)
+    in_progress_count = Column(Integer, default=0, nullable=False)
+    blocked_count = Column(Integer, default=0, nullable=False)
+    done_count = Column(Integer, default=0, nullable=False)
+    remaining_estimate = Column(Float, default=0.0, nullable=False)  # Hours estimated on open tasks
+    spent = Column(Float, default=0.0, nullable=False)  # Hours spent on all tasks
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Enum, Float, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Enum, Float, JSON, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 import enum
 from app.core.database import Base
@@ -21,6 +22,24 @@ class TaskPriority(str, enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_project_id_status_created_at_id", "project_id", "status", "created_at", "id"),
+        Index(
+            "ix_tasks_next_occurrence_at",
+            "next_occurrence_at",
+            postgresql_where=text("next_occurrence_at IS NOT NULL"),
+        ),
+        Index("uq_tasks_recurrence_occurrence", "recurrence_template_id", "occurrence_at", unique=True),
+        Index("ix_tasks_project_id_status_due_date", "project_id", "status", "due_date"),
+        Index(
+            "ix_tasks_due_date_open",
+            "due_date",
+            postgresql_where=text("status <> 'DONE'"),
+        ),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_tasks_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_tasks_title_prefix", text('lower(title) COLLATE "C"')),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
@@ -33,15 +52,28 @@ class Task(Base):
     estimate = Column(Float, nullable=True)  # Hours
     spent = Column(Float, default=0.0, nullable=False)  # Hours
     recurrence = Column(String, nullable=True)  # RRULE string
+    next_occurrence_at = Column(DateTime(timezone=True), nullable=True)  # Next instance to generate from the RRULE
+    recurrence_template_id = Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True)  # Recurring task this is an instance of; instances outlive it
+    occurrence_at = Column(DateTime(timezone=True), nullable=True)  # Occurrence this instance was generated for
     tags = Column(JSON, default=list, nullable=False)  # Array of tag names for quick access
     attachments = Column(JSON, default=list, nullable=False)
     task_metadata = Column("metadata", JSON, default=dict, nullable=False)  # Renamed to avoid SQLAlchemy conflict
+    completed_at = Column(DateTime(timezone=True), nullable=True)  # Set when the task moves to DONE
+    # Weighted full-text document (title A, description B), maintained by PostgreSQL
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('italian'::regconfig, coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('italian'::regconfig, coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     project = relationship("Project", back_populates="tasks")
-    parent = relationship("Task", remote_side=[id], backref="subtasks")
+    parent = relationship("Task", remote_side=[id], foreign_keys=[parent_id], backref="subtasks")
     assignees = relationship("TaskAssignee", back_populates="task", cascade="all, delete-orphan")
     watchers = relationship("TaskWatcher", back_populates="task", cascade="all, delete-orphan")
     dependencies = relationship(
@@ -61,6 +93,10 @@ class Task(Base):
 
 class TaskAssignee(Base):
     __tablename__ = "task_assignees"
+    __table_args__ = (
+        Index("ix_task_assignees_user_id_task_id", "user_id", "task_id"),
+        Index("ix_task_assignees_task_id", "task_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
@@ -127,12 +163,21 @@ class TaskTag(Base):
 
 class TaskComment(Base):
     __tablename__ = "task_comments"
+    __table_args__ = (
+        Index("ix_task_comments_task_id_created_at_id", "task_id", "created_at", "id"),
+        Index("ix_task_comments_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     content = Column(Text, nullable=False)
     mentions = Column(JSON, default=list, nullable=False)  # Array of user IDs mentioned
+    # Full-text document of the comment body, maintained by PostgreSQL
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('italian'::regconfig, content)", persisted=True),
+    ))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
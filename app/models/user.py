@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, JSON, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Enum, JSON, DateTime, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -13,6 +13,11 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Prefix lookups of the mention picker (lower(...) LIKE 'abc%')
+        Index("ix_users_full_name_prefix", text('lower(full_name) COLLATE "C"')),
+        Index("ix_users_email_prefix", text('lower(email) COLLATE "C"')),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+
+
+class SearchResult(BaseModel):
+    type: str  # "task", "event", "comment" or "project"
+    id: int
+    title: str
+    description: Optional[str] = None
+    snippet: Optional[str] = None  # HTML: matched fragments of description, escaped, terms wrapped in <b>
+    task_id: Optional[int] = None  # Set for comments
+    score: Optional[float] = None
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
+    total: int
+    facets: Dict[str, int]  # Matches per type, regardless of the type filter
+    next_cursor: Optional[str] = None
+
+
+class SuggestHit(BaseModel):
+    type: str  # "task", "event" or "user"
+    id: int
+    label: str
+    detail: Optional[str] = None  # Email for users
+
+
+class SuggestResponse(BaseModel):
+    results: List[SuggestHit]
@@ -57,6 +57,11 @@ class TaskCommentResponse(BaseModel):
         from_attributes = True
 
 
+class TaskCommentPage(BaseModel):
+    items: List[TaskCommentResponse]
+    next_cursor: Optional[str] = None
+
+
 class TaskResponse(TaskBase):
     id: int
     project_id: Optional[int]
@@ -66,6 +71,9 @@ class TaskResponse(TaskBase):
     attachments: List[dict]
     assignees: List[TaskAssigneeResponse] = []
     comments: List[TaskCommentResponse] = []
+    comment_count: int = 0
+    next_occurrence_at: Optional[datetime] = None
+    recurrence_template_id: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -82,3 +90,39 @@ class TimeTrackingRequest(BaseModel):
     hours: float
     description: Optional[str] = None
 
+
+
+class TaskBulkFilter(BaseModel):
+    project_id: Optional[int] = None
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+    assignee_id: Optional[int] = None
+
+
+class TaskBulkPatch(BaseModel):
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+    project_id: Optional[int] = None
+    due_date: Optional[datetime] = None
+    assignee_ids: Optional[List[int]] = None  # Replaces the current assignees
+
+
+class TaskBulkUpdate(BaseModel):
+    ids: Optional[List[int]] = None
+    filter: Optional[TaskBulkFilter] = None
+    patch: TaskBulkPatch
+
+
+class TaskBulkResult(BaseModel):
+    id: int
+    result: str = "updated"  # Or "not_found" for a requested id that matched no task; the fields below are then empty
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+    project_id: Optional[int] = None
+    due_date: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class TaskBulkUpdateResponse(BaseModel):
+    updated: int
+    results: List[TaskBulkResult]
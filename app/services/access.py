@@ -0,0 +1,55 @@
+"""
+Access scopes
+SQL conditions selecting the rows a user may see, so list and search queries
+filter in the database instead of loading everything and checking in Python.
+"""
+from sqlalchemy import select, or_, cast
+from sqlalchemy.dialects.postgresql import JSONB
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task, TaskAssignee, TaskComment
+from app.models.calendar import Calendar, Event, EventAttendee
+
+
+def accessible_project_ids(user: User):
+    """Ids of the projects the user owns or shares a team with."""
+    condition = Project.owner_id == user.id
+    if user.team:
+        condition = or_(condition, Project.team_id == user.team)
+    return select(Project.id).where(condition)
+
+
+def accessible_calendar_ids(user: User):
+    """Ids of the calendars the user owns or is listed in the ACL of."""
+    return select(Calendar.id).where(
+        or_(
+            Calendar.owner_id == user.id,
+            cast(Calendar.acl, JSONB)["users"].contains([user.id]),
+        )
+    )
+
+
+def visible_tasks_clause(user: User):
+    """Tasks in an accessible project, or assigned to the user."""
+    return or_(
+        Task.project_id.in_(accessible_project_ids(user)),
+        Task.id.in_(select(TaskAssignee.task_id).where(TaskAssignee.user_id == user.id)),
+    )
+
+
+def visible_events_clause(user: User):
+    """Events in an accessible calendar, or attended by the user."""
+    return or_(
+        Event.calendar_id.in_(accessible_calendar_ids(user)),
+        Event.id.in_(select(EventAttendee.event_id).where(EventAttendee.user_id == user.id)),
+    )
+
+
+def visible_comments_clause(user: User):
+    """Comments on tasks the user can see."""
+    return TaskComment.task_id.in_(select(Task.id).where(visible_tasks_clause(user)))
+
+
+def visible_projects_clause(user: User):
+    """Projects the user owns or shares a team with."""
+    return Project.id.in_(accessible_project_ids(user))
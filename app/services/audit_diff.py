@@ -0,0 +1,204 @@
+"""
+Field-level audit diffs from ORM flushes
+
+A before_flush listener reads the attribute history SQLAlchemy already keeps
+for every pending change and turns it into {"field": {"old": ..., "new": ...}}
+diffs, without loading anything: values that were never loaded are reported as
+None instead of being fetched. New rows get their ids after the flush, and
+records join the request's AuditContext only once the transaction commits; the
+audit middleware hands them to the writer with an awaited submit() after the
+endpoint returns, so a full queue blocks the request instead of losing them.
+A rolled-back savepoint discards only the records of its own flushes.
+
+Changes are attributed to the AuditContext the audit middleware sets for the
+request; flushes outside a request (workers, scripts) are not audited here.
+Bulk UPDATE/DELETE statements bypass the ORM and are not seen either.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from contextvars import ContextVar
+from datetime import date, datetime, timezone
+from decimal import Decimal
+import enum
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history, PASSIVE_NO_INITIALIZE
+from app.models.audit import AuditAction
+from app.models.automation import AutomationRule
+from app.models.calendar import Calendar, Event
+from app.models.integration import Integration
+from app.models.project import Project
+from app.models.resource import Resource
+from app.models.task import Task, TaskComment
+from app.models.user import User
+
+# Audited models and the attributes they may report: None allows every column attribute
+AUDIT_ALLOW = {
+    Task: None,
+    TaskComment: None,
+    Event: None,
+    Calendar: None,
+    Project: None,
+    Resource: None,
+    AutomationRule: None,
+    Integration: ("type", "name", "status", "is_active"),  # config holds credentials
+    User: ("email", "full_name", "role", "team", "timezone", "is_active"),
+}
+
+# Never reported, whatever the allow list says
+AUDIT_DENY = {"id", "password_hash", "search_vector", "created_at", "updated_at"}
+
+
+class AuditContext:
+    """Who is making the current request's changes; `records` collects the committed entries."""
+
+    __slots__ = ("user_id", "ip_address", "user_agent", "records")
+
+    def __init__(self, user_id: int, ip_address: Optional[str], user_agent: Optional[str]):
+        self.user_id = user_id
+        self.ip_address = ip_address
+        self.user_agent = user_agent
+        self.records: List[Dict[str, Any]] = []
+
+
+audit_context: ContextVar[Optional[AuditContext]] = ContextVar("audit_context", default=None)
+
+_audited_keys: Dict[type, Tuple[str, ...]] = {}
+
+
+def audited_keys(model: type) -> Tuple[str, ...]:
+    """Column attributes of an audited model that diffs may contain."""
+    keys = _audited_keys.get(model)
+    if keys is None:
+        allow = AUDIT_ALLOW[model]
+        keys = tuple(
+            attr.key for attr in inspect(model).column_attrs
+            if attr.key not in AUDIT_DENY and (allow is None or attr.key in allow)
+        )
+        _audited_keys[model] = keys
+    return keys
+
+
+_PLAIN_TYPES = (type(None), str, int, float, bool, list, dict)
+
+
+def _jsonable(value: Any) -> Any:
+    if type(value) in _PLAIN_TYPES:
+        return value
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _first(values) -> Any:
+    return _jsonable(values[0]) if values else None
+
+
+_PENDING_KEY = "audit_pending"
+_RECORDS_KEY = "audit_records"
+_SAVEPOINTS_KEY = "audit_savepoints"
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_audit_diffs(session: Session, flush_context, instances) -> None:
+    """Turn the attribute history of audited objects into diffs before the flush resets it."""
+    context = audit_context.get()
+    if context is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, [])
+
+    for instance in session.new:
+        if type(instance) in AUDIT_ALLOW:
+            # Only what was set; the id is filled in after the INSERT
+            values = inspect(instance).dict
+            diff = {
+                key: {"old": None, "new": _jsonable(values[key])}
+                for key in audited_keys(type(instance)) if values.get(key) is not None
+            }
+            pending.append((instance.__tablename__, instance, AuditAction.CREATE, diff))
+
+    for instance in session.dirty:
+        if type(instance) not in AUDIT_ALLOW:
+            continue
+        state = inspect(instance)
+        keys = audited_keys(type(instance))
+        diff = {}
+        # committed_state holds exactly the attributes modified since load, so only those are inspected
+        for key in state.committed_state:
+            if key in keys:
+                history = get_history(instance, key, passive=PASSIVE_NO_INITIALIZE)
+                if history.added or history.deleted:
+                    diff[key] = {"old": _first(history.deleted), "new": _first(history.added)}
+        # Dirty without audited changes: relationship-only or denied columns
+        if diff:
+            pending.append((instance.__tablename__, state.identity[0], AuditAction.UPDATE, diff))
+
+    for instance in session.deleted:
+        if type(instance) in AUDIT_ALLOW:
+            values = inspect(instance).dict
+            diff = {
+                key: {"old": _jsonable(values[key]), "new": None}
+                for key in audited_keys(type(instance)) if values.get(key) is not None
+            }
+            pending.append((instance.__tablename__, inspect(instance).identity[0], AuditAction.DELETE, diff))
+
+
+@event.listens_for(Session, "after_flush")
+def _resolve_created_ids(session: Session, flush_context) -> None:
+    """Turn this flush's diffs into audit records, now that new rows have primary keys."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    context = audit_context.get()
+    if not pending or context is None:
+        return
+    records = session.info.setdefault(_RECORDS_KEY, [])
+    now = datetime.now(timezone.utc)
+    for entity_type, target, action, diff in pending:
+        records.append({
+            "entity_type": entity_type,
+            "entity_id": target if action != AuditAction.CREATE else target.id,
+            "action": action,
+            "user_id": context.user_id,
+            "timestamp": now,
+            "diff": diff,
+            "ip_address": context.ip_address,
+            "user_agent": context.user_agent,
+        })
+
+
+@event.listens_for(Session, "after_commit")
+def _collect_committed_records(session: Session) -> None:
+    records = session.info.pop(_RECORDS_KEY, None)
+    if not records:
+        return
+    context = audit_context.get()
+    if context is not None:
+        context.records.extend(records)
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _mark_savepoint(session: Session, transaction) -> None:
+    """Remember how many records a savepoint started with, to drop only its own on rollback."""
+    if transaction.nested:
+        session.info.setdefault(_SAVEPOINTS_KEY, {})[transaction] = len(session.info.get(_RECORDS_KEY, ()))
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_savepoints(session: Session, transaction) -> None:
+    # Runs before after_soft_rollback, so savepoint marks are only dropped with the outermost transaction
+    if transaction.parent is None:
+        session.info.pop(_SAVEPOINTS_KEY, None)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_audit_records(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    if previous_transaction.parent is None:
+        session.info.pop(_RECORDS_KEY, None)
+    elif previous_transaction.nested:
+        mark = session.info.get(_SAVEPOINTS_KEY, {}).pop(previous_transaction, None)
+        records = session.info.get(_RECORDS_KEY)
+        if mark is not None and records is not None:
+            del records[mark:]
@@ -0,0 +1,114 @@
+"""
+Monthly partitions of audit_logs
+
+audit_logs is range-partitioned on timestamp, one partition per UTC month
+named audit_logs_YYYY_MM. Partitions are created a few months ahead, so writes
+never hit a missing range. Once a partition is older than the retention
+period, its rows are streamed to a gzip-compressed JSONL file and the
+partition is detached and dropped. Queries bounded on timestamp are pruned to
+the partitions they can match.
+
+All functions take a synchronous Connection (Celery workers, migrations and
+metadata DDL events) and leave transaction control to the caller.
+"""
+from typing import List, Tuple
+from datetime import date, datetime, timezone
+import gzip
+import json
+import os
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+from app.models.audit import AuditLog
+
+_PARTITION_NAME = re.compile(r"^audit_logs_(\d{4})_(\d{2})$")
+
+# Rows fetched per round trip while archiving a partition
+ARCHIVE_BATCH_SIZE = 5000
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_of(moment: datetime) -> date:
+    moment = moment.astimezone(timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"audit_logs_{month:%Y_%m}"
+
+
+def ensure_partitions(conn: Connection, first: date, last: date) -> List[str]:
+    """Create the monthly partitions from first through last that don't exist yet."""
+    created = []
+    existing = {name for name, _ in list_partitions(conn)}
+    month = first
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF audit_logs "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+            ))
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def list_partitions(conn: Connection) -> List[Tuple[str, date]]:
+    """(name, month) of every monthly partition attached to audit_logs, oldest first."""
+    rows = conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = 'audit_logs'::regclass"
+    )).scalars()
+    partitions = []
+    for name in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def archive_partition(conn: Connection, name: str, directory: str) -> str:
+    """Write every row of a partition to {directory}/{name}.jsonl.gz, streaming with a server-side cursor."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.jsonl.gz")
+    partial = path + ".partial"
+    columns = [column.name for column in AuditLog.__table__.columns]
+
+    result = conn.execute(
+        text(f"SELECT {', '.join(columns)} FROM {name} ORDER BY timestamp, id"),
+        execution_options={"stream_results": True, "yield_per": ARCHIVE_BATCH_SIZE},
+    )
+    with gzip.open(partial, "wt", encoding="utf-8") as archive:
+        for row in result:
+            archive.write(json.dumps(dict(zip(columns, row)), default=str))
+            archive.write("\n")
+    # Only a complete archive gets the final name
+    os.replace(partial, path)
+    return path
+
+
+def apply_retention(conn: Connection, now: datetime, retention_months: int, directory: str) -> List[str]:
+    """Archive, detach and drop partitions whose month ended more than retention_months ago."""
+    cutoff = add_months(month_of(now), -retention_months)
+    archived = []
+    for name, month in list_partitions(conn):
+        if month >= cutoff:
+            break
+        path = archive_partition(conn, name, directory)
+        conn.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+        archived.append(path)
+    return archived
+
+
+def create_initial_partitions(conn: Connection) -> List[str]:
+    """Partitions for the current month and AUDIT_PARTITIONS_AHEAD months after it."""
+    current = month_of(datetime.now(timezone.utc))
+    return ensure_partitions(conn, current, add_months(current, settings.AUDIT_PARTITIONS_AHEAD))
@@ -0,0 +1,137 @@
+"""
+Batched audit-log writer
+
+Request handlers hand audit records to a bounded in-process queue and return
+without touching the database. A background task drains the queue and writes
+records with multi-row INSERTs, whenever AUDIT_BATCH_SIZE records are waiting
+or AUDIT_FLUSH_INTERVAL_MS has passed since the first one arrived. The queue is
+drained on shutdown, so a clean stop loses nothing; a crash loses at most what
+is still queued.
+
+When the queue is full the overflow policy decides:
+"block" makes the caller wait for room (backpressure, nothing lost),
+"drop_newest" discards the new record and "drop_oldest" discards the oldest
+queued one. Dropped records are counted in stats(). Synchronous callers of
+submit_nowait cannot wait, so under "block" their overflowing records are
+dropped as with "drop_newest"; memory stays bounded. The ORM audit hooks do not
+go through it: the audit middleware awaits submit() for their records.
+"""
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+from sqlalchemy import insert
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+
+class AuditWriter:
+    """Queue audit records and write them in batches from a background task."""
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float, overflow: str):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy {overflow!r}, expected one of {OVERFLOW_POLICIES}")
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Counters exposed by stats()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Start the flush task on the running loop; called lazily by submit() too."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = self._loop.create_task(self._run())
+
+    async def submit(self, record: Dict[str, Any]) -> None:
+        """Queue one record: a dict of AuditLog column values, every record with the same keys."""
+        if self.overflow == "block" and self._queue is not None and self._queue.full() and self._loop is asyncio.get_running_loop():
+            await self._queue.put(record)
+        else:
+            self.submit_nowait(record)
+
+    def submit_nowait(self, record: Dict[str, Any]) -> None:
+        """submit() for synchronous callers, which cannot wait: "block" drops the newest."""
+        if self._task is None or self._loop is not asyncio.get_running_loop():
+            self.start()
+
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            if self.overflow == "drop_oldest":
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self._queue.put_nowait(record)
+                self.dropped += 1
+            else:
+                self.dropped += 1
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            try:
+                while len(batch) < self.batch_size:
+                    timeout = deadline - asyncio.get_running_loop().time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            finally:
+                # Also runs when cancelled mid-collection, so records taken off the queue are still written
+                await self._write(batch)
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(AuditLog).values(batch))
+                await db.commit()
+            self.written += len(batch)
+        except Exception as e:
+            # Audit logging must never fail requests; the batch is lost but counted
+            self.failed += len(batch)
+            logger.error(f"Audit batch of {len(batch)} records failed: {e}")
+
+    async def stop(self) -> None:
+        """Write everything still queued, then stop the flush task."""
+        if self._task is None or self._loop is not asyncio.get_running_loop():
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+audit_writer = AuditWriter(
+    settings.AUDIT_QUEUE_SIZE,
+    settings.AUDIT_BATCH_SIZE,
+    settings.AUDIT_FLUSH_INTERVAL_MS / 1000.0,
+    settings.AUDIT_OVERFLOW,
+)
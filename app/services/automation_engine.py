@@ -119,23 +119,10 @@ class AutomationEngine:
                 logger.error(f"Error executing action in rule {rule.id}: {e}")
     
     @staticmethod
-    async def trigger_event(trigger_type: str, entity: Any, db):
-        """Trigger automation rules for a specific event type."""
-        from sqlalchemy import select
-        
-        # Find all active rules for this trigger
-        result = await db.execute(
-            select(AutomationRule).where(
-                AutomationRule.trigger == trigger_type,
-                AutomationRule.is_active == True
-            )
-        )
-        rules = result.scalars().all()
-        
-        # Convert entity to dict
-        entity_dict = {}
+    def entity_to_dict(entity: Any) -> Dict[str, Any]:
+        """Convert a task or event into the dict evaluated by rule conditions."""
         if isinstance(entity, Task):
-            entity_dict = {
+            return {
                 "id": entity.id,
                 "title": entity.title,
                 "status": entity.status.value if hasattr(entity.status, 'value') else str(entity.status),
@@ -144,14 +131,54 @@ class AutomationEngine:
                 "tags": entity.tags,
             }
         elif isinstance(entity, Event):
-            entity_dict = {
+            return {
                 "id": entity.id,
                 "title": entity.title,
                 "start": entity.start.isoformat() if entity.start else None,
                 "calendar_id": entity.calendar_id,
             }
+        return {}
+    
+    @staticmethod
+    async def _load_rules(trigger_type: str, db) -> List[AutomationRule]:
+        """Load the active rules registered for a trigger."""
+        from sqlalchemy import select
+        
+        result = await db.execute(
+            select(AutomationRule).where(
+                AutomationRule.trigger == trigger_type,
+                AutomationRule.is_active == True
+            )
+        )
+        return result.scalars().all()
+    
+    @staticmethod
+    async def trigger_event(trigger_type: str, entity: Any, db):
+        """Trigger automation rules for a specific event type."""
+        # Find all active rules for this trigger
+        rules = await AutomationEngine._load_rules(trigger_type, db)
+        
+        # Convert entity to dict
+        entity_dict = AutomationEngine.entity_to_dict(entity)
         
         # Process each rule
         for rule in rules:
             await AutomationEngine.process_rule(rule, entity_dict, db)
-
+    
+    @staticmethod
+    async def trigger_batch(trigger_type: str, entities: List[Dict[str, Any]], db):
+        """Trigger automation rules once for a batch of already-serialized entities.
+        
+        Rules are loaded with a single query and evaluated against every entity,
+        instead of re-querying them per entity as repeated trigger_event calls would.
+        """
+        if not entities:
+            return
+        
+        rules = await AutomationEngine._load_rules(trigger_type, db)
+        if not rules:
+            return
+        
+        for entity_dict in entities:
+            for rule in rules:
+                await AutomationEngine.process_rule(rule, entity_dict, db)
@@ -0,0 +1,190 @@
+"""
+Dashboard metrics
+Computes the personal dashboard in a single statement and keeps a short-lived
+per-user copy in Redis that task/event writes invalidate. Team metrics are read
+from the daily aggregate tables maintained by the refresh_team_metrics job.
+"""
+from typing import Any, Dict, Iterable, Optional, Sequence
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import cache_get_json, cache_set_json, cache_delete
+from app.core.config import settings
+from app.models.task import Task, TaskAssignee, TaskStatus, TaskPriority
+from app.models.calendar import Event, EventAttendee
+from app.models.user import User
+from app.models.resource import Resource
+from app.models.metrics import TeamDailyMetrics, ResourceDailyBooking
+
+# Windows used by the team dashboard, in UTC days including today
+TEAM_WEEK_DAYS = 7
+TEAM_LEAD_TIME_DAYS = 30
+
+
+def personal_dashboard_key(user_id: int) -> str:
+    return f"dashboard:personal:{user_id}"
+
+
+async def compute_personal_dashboard(db: AsyncSession, user_id: int) -> Dict[str, Any]:
+    """Compute all personal metrics with one CTE query and FILTER aggregates."""
+    now = datetime.now(timezone.utc)
+    next_week = now + timedelta(days=7)
+
+    user_tasks = (
+        select(Task.status, Task.priority, Task.due_date, Task.spent)
+        .where(Task.id.in_(select(TaskAssignee.task_id).where(TaskAssignee.user_id == user_id)))
+        .cte("user_tasks")
+    )
+    upcoming_events = (
+        select(func.count(Event.id))
+        .join(EventAttendee)
+        .where(
+            and_(
+                EventAttendee.user_id == user_id,
+                Event.start >= now,
+                Event.start <= next_week,
+            )
+        )
+        .scalar_subquery()
+    )
+
+    query = select(
+        *[
+            func.count().filter(user_tasks.c.status == task_status).label(f"status_{task_status.name}")
+            for task_status in TaskStatus
+        ],
+        *[
+            func.count().filter(user_tasks.c.priority == priority).label(f"priority_{priority.name}")
+            for priority in TaskPriority
+        ],
+        func.count().filter(
+            and_(user_tasks.c.due_date < now, user_tasks.c.status != TaskStatus.DONE)
+        ).label("overdue_tasks"),
+        func.coalesce(func.sum(user_tasks.c.spent), 0.0).label("total_spent_hours"),
+        upcoming_events.label("upcoming_events"),
+    ).select_from(user_tasks)
+
+    row = (await db.execute(query)).one()._mapping
+
+    # Keys and zero-omission match the previous GROUP BY based output
+    tasks_by_status = {
+        str(task_status): row[f"status_{task_status.name}"]
+        for task_status in TaskStatus
+        if row[f"status_{task_status.name}"]
+    }
+    tasks_by_priority = {
+        str(priority): row[f"priority_{priority.name}"]
+        for priority in TaskPriority
+        if row[f"priority_{priority.name}"]
+    }
+
+    return {
+        "tasks_by_status": tasks_by_status,
+        "tasks_by_priority": tasks_by_priority,
+        "upcoming_events": row["upcoming_events"] or 0,
+        "overdue_tasks": row["overdue_tasks"] or 0,
+        "total_spent_hours": float(row["total_spent_hours"] or 0.0),
+    }
+
+
+async def compute_team_dashboard(db: AsyncSession, team: Optional[str]) -> Dict[str, Any]:
+    """Compute team metrics from the daily aggregate tables kept by refresh_team_metrics."""
+    today = datetime.now(timezone.utc).date()
+    week_start = today - timedelta(days=TEAM_WEEK_DAYS - 1)
+    lead_time_start = today - timedelta(days=TEAM_LEAD_TIME_DAYS - 1)
+
+    team_members = select(func.count(User.id)).where(User.team == team).scalar_subquery()
+    latest_active = (
+        select(TeamDailyMetrics.active_tasks)
+        .where(TeamDailyMetrics.team == team, TeamDailyMetrics.active_tasks.isnot(None))
+        .order_by(TeamDailyMetrics.day.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    totals = (await db.execute(
+        select(
+            team_members.label("team_members"),
+            latest_active.label("active_tasks"),
+            func.coalesce(
+                func.sum(TeamDailyMetrics.tasks_completed).filter(TeamDailyMetrics.day >= week_start), 0
+            ).label("completed_this_week"),
+            func.coalesce(func.sum(TeamDailyMetrics.tasks_completed), 0).label("completed"),
+            func.coalesce(func.sum(TeamDailyMetrics.lead_time_hours_sum), 0.0).label("lead_time_hours"),
+        ).where(
+            TeamDailyMetrics.team == team,
+            TeamDailyMetrics.day >= lead_time_start,
+            TeamDailyMetrics.day <= today,
+        )
+    )).one()
+
+    bookings = await db.execute(
+        select(Resource.name, func.sum(ResourceDailyBooking.booked_hours))
+        .join(Resource, Resource.id == ResourceDailyBooking.resource_id)
+        .where(
+            ResourceDailyBooking.team == team,
+            ResourceDailyBooking.day >= week_start,
+            ResourceDailyBooking.day <= today,
+        )
+        .group_by(Resource.name)
+    )
+    available_hours = TEAM_WEEK_DAYS * settings.RESOURCE_HOURS_PER_DAY
+    resource_utilization = {
+        name: round(float(booked_hours or 0.0) / available_hours, 4)
+        for name, booked_hours in bookings.all()
+    }
+
+    return {
+        "team_members": totals.team_members or 0,
+        "active_tasks": totals.active_tasks or 0,
+        "completed_tasks_this_week": int(totals.completed_this_week),
+        "average_lead_time": float(totals.lead_time_hours) / totals.completed if totals.completed else 0.0,
+        "resource_utilization": resource_utilization,
+    }
+
+
+async def get_personal_dashboard(db: AsyncSession, user_id: int) -> Dict[str, Any]:
+    """Return the personal metrics from the cache, computing them on a miss."""
+    key = personal_dashboard_key(user_id)
+    cached = await cache_get_json(key)
+    if cached is not None:
+        return cached
+
+    metrics = await compute_personal_dashboard(db, user_id)
+    await cache_set_json(key, metrics, settings.DASHBOARD_CACHE_TTL)
+    return metrics
+
+
+async def invalidate_personal_dashboards(user_ids: Iterable[int]) -> None:
+    """Drop the cached personal dashboards of the given users."""
+    keys = {personal_dashboard_key(user_id) for user_id in user_ids if user_id is not None}
+    await cache_delete(*keys)
+
+
+async def invalidate_task_dashboards(
+    db: AsyncSession,
+    task_ids: Sequence[int],
+    extra_user_ids: Iterable[int] = (),
+) -> None:
+    """Invalidate the dashboards of everyone assigned to the given tasks."""
+    user_ids = set(extra_user_ids)
+    if task_ids:
+        result = await db.execute(
+            select(TaskAssignee.user_id).where(TaskAssignee.task_id.in_(task_ids)).distinct()
+        )
+        user_ids.update(result.scalars().all())
+    await invalidate_personal_dashboards(user_ids)
+
+
+async def invalidate_event_dashboards(
+    db: AsyncSession,
+    event_ids: Sequence[int],
+    extra_user_ids: Iterable[int] = (),
+) -> None:
+    """Invalidate the dashboards of everyone attending the given events."""
+    user_ids = set(extra_user_ids)
+    if event_ids:
+        result = await db.execute(
+            select(EventAttendee.user_id).where(EventAttendee.event_id.in_(event_ids)).distinct()
+        )
+        user_ids.update(result.scalars().all())
+    await invalidate_personal_dashboards(user_ids)
@@ -0,0 +1,71 @@
+"""
+Recurrence helpers
+Expand RRULE strings stored on tasks into concrete occurrence datetimes
+"""
+from typing import List, Optional
+from datetime import datetime, timezone
+from dateutil.rrule import rrulestr
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC so they compare with stored timestamps."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _parse_rule(recurrence: str, anchor: datetime):
+    """Parse an RRULE, using anchor as DTSTART unless the rule carries its own."""
+    try:
+        rule = rrulestr(recurrence, dtstart=_as_utc(anchor), forceset=True)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Invalid recurrence rule {recurrence!r}: {e}")
+        return None
+    return rule
+
+
+def next_occurrence(recurrence: Optional[str], anchor: datetime, after: datetime) -> Optional[datetime]:
+    """Return the first occurrence strictly after `after`, or None if the rule is exhausted or invalid."""
+    if not recurrence:
+        return None
+    rule = _parse_rule(recurrence, anchor)
+    if rule is None:
+        return None
+    try:
+        return rule.after(_as_utc(after), inc=False)
+    except TypeError:
+        # DTSTART in the rule was naive, compare in naive UTC
+        occurrence = rule.after(_as_utc(after).replace(tzinfo=None), inc=False)
+        return _as_utc(occurrence) if occurrence else None
+
+
+def due_occurrences(
+    recurrence: str,
+    anchor: datetime,
+    start: datetime,
+    until: datetime,
+    limit: int,
+) -> List[datetime]:
+    """Return up to `limit` occurrences in [start, until], oldest first."""
+    rule = _parse_rule(recurrence, anchor)
+    if rule is None:
+        return []
+
+    start, until = _as_utc(start), _as_utc(until)
+    occurrences = []
+    try:
+        iterator = rule.xafter(start, inc=True)
+        for occurrence in iterator:
+            if occurrence > until or len(occurrences) >= limit:
+                break
+            occurrences.append(occurrence)
+    except TypeError:
+        naive_start, naive_until = start.replace(tzinfo=None), until.replace(tzinfo=None)
+        for occurrence in rule.xafter(naive_start, inc=True):
+            if occurrence > naive_until or len(occurrences) >= limit:
+                break
+            occurrences.append(_as_utc(occurrence))
+    return occurrences
@@ -0,0 +1,595 @@
+"""
+Search backends
+Ranked full-text search behind one interface. PostgresSearchBackend runs on the
+generated tsvector columns and GIN/trigram indexes; InMemorySearchBackend keeps
+a BM25 inverted index in process memory for local and test deployments, fed by
+ORM write hooks. Both apply the same visibility rules through the database.
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from abc import ABC, abstractmethod
+from array import array
+from collections import Counter
+import html
+import math
+import re
+import numpy as np
+from sqlalchemy import select, func, or_, not_, literal, union_all, tuple_, any_, event, inspect, Float, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.models.user import User
+from app.models.task import Task, TaskComment
+from app.models.calendar import Event
+from app.models.project import Project
+from app.schemas.search import SearchResult, SearchResponse
+from app.services.access import (
+    visible_tasks_clause,
+    visible_events_clause,
+    visible_comments_clause,
+    visible_projects_clause,
+)
+
+# Text search configuration of the generated search_vector columns
+SEARCH_CONFIG = "italian"
+
+# Shorter queries have too few trigrams for the title indexes to narrow anything down
+TRIGRAM_MIN_QUERY_LENGTH = 3
+
+# ts_headline options for result snippets
+HEADLINE_OPTIONS = "MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=\" … \""
+
+
+def _html_escaped(column):
+    """SQL expression escaping &, < and > in column, so only the snippet's own <b> tags are markup."""
+    escaped = func.coalesce(column, "")
+    for character, entity in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;")):
+        escaped = func.replace(escaped, character, entity)
+    return escaped
+
+
+class SearchSource(NamedTuple):
+    """How one entity type takes part in search."""
+    model: Any
+    title: Any  # Column shown as the result title
+    body: Any  # Column the description and snippet come from
+    visibility: Callable  # User -> condition selecting the rows they may see
+    fuzzy: bool = False  # Title has a trigram index, so it joins the typo-tolerant fallback
+    task_id: Any = None  # Task a hit belongs to; its title is shown for the hit
+
+
+SEARCH_SOURCES = {
+    "task": SearchSource(Task, Task.title, Task.description, visible_tasks_clause, fuzzy=True),
+    "event": SearchSource(Event, Event.title, Event.description, visible_events_clause, fuzzy=True),
+    "comment": SearchSource(
+        TaskComment, Task.title, TaskComment.content, visible_comments_clause, task_id=TaskComment.task_id
+    ),
+    "project": SearchSource(Project, Project.name, Project.description, visible_projects_clause),
+}
+
+
+class SearchBackend(ABC):
+    """Ranked, visibility-filtered, cursor-paginated search over SEARCH_SOURCES."""
+
+    @abstractmethod
+    async def search(
+        self,
+        db: AsyncSession,
+        user: User,
+        q: str,
+        types: Sequence[str],
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> SearchResponse:
+        """Return one page of hits of the given types, best first, with per-type facets."""
+
+    def index_document(
+        self,
+        result_type: str,
+        entity_id: int,
+        title: Optional[str],
+        body: Optional[str],
+        task_id: Optional[int] = None,
+    ) -> None:
+        """Add or replace a document. Backends reading the database directly ignore this."""
+
+    def remove_document(self, result_type: str, entity_id: int) -> None:
+        """Drop a document. Backends reading the database directly ignore this."""
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Load every searchable row. Backends reading the database directly ignore this."""
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Full-text search on the tsvector GIN indexes, with a trigram fallback for few hits."""
+
+    @staticmethod
+    def _fuzzy_match(source: SearchSource, q: str):
+        """Title contains q or is word-similar to it; both served by the trigram index."""
+        pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return or_(
+            source.title.ilike(pattern),
+            literal(q).op("<%")(source.title),
+        )
+
+    @staticmethod
+    async def _count_matches(db: AsyncSession, conditions: Dict[str, list]) -> Dict[str, int]:
+        """Count the rows matching each type's conditions in one round trip."""
+        counts = []
+        for result_type, where in conditions.items():
+            model = SEARCH_SOURCES[result_type].model
+            counts.append(
+                select(func.count()).select_from(model).where(*where).scalar_subquery().label(result_type)
+            )
+        row = (await db.execute(select(*counts))).one()
+        return dict(row._mapping)
+
+    @staticmethod
+    async def _load_page_details(db: AsyncSession, rows, ts_query) -> Dict[tuple, Any]:
+        """Titles, bodies and ts_headline snippets for the rows of one page only."""
+        ids_by_type: Dict[str, List[int]] = {}
+        for row in rows:
+            ids_by_type.setdefault(row.type, []).append(row.id)
+        if not ids_by_type:
+            return {}
+
+        branches = []
+        for result_type, ids in ids_by_type.items():
+            source = SEARCH_SOURCES[result_type]
+            branch = select(
+                literal(result_type).label("type"),
+                source.model.id.label("id"),
+                source.title.label("title"),
+                source.body.label("description"),
+                func.ts_headline(
+                    SEARCH_CONFIG, _html_escaped(source.body), ts_query, HEADLINE_OPTIONS
+                ).label("snippet"),
+                (source.task_id if source.task_id is not None else literal(None, Integer)).label("task_id"),
+            ).where(source.model.id.in_(ids))
+            if source.task_id is not None:
+                branch = branch.join(Task, Task.id == source.task_id)
+            branches.append(branch)
+
+        result = await db.execute(union_all(*branches))
+        return {(row.type, row.id): row for row in result.all()}
+
+    async def search(
+        self,
+        db: AsyncSession,
+        user: User,
+        q: str,
+        types: Sequence[str],
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> SearchResponse:
+        ts_query = func.plainto_tsquery(SEARCH_CONFIG, q)
+
+        # Full-text matches through the GIN index on the generated search_vector columns
+        visible = {result_type: source.visibility(user) for result_type, source in SEARCH_SOURCES.items()}
+        facets = await self._count_matches(db, {
+            result_type: [visible[result_type], source.model.search_vector.op("@@")(ts_query)]
+            for result_type, source in SEARCH_SOURCES.items()
+        })
+
+        # Partial words, codes like "PRJ-12" and typos miss the stemmed index: fall back to trigrams
+        query_text = q.strip()
+        fuzzy = (
+            sum(facets[result_type] for result_type in types) < settings.SEARCH_MIN_RESULTS
+            and len(query_text) >= TRIGRAM_MIN_QUERY_LENGTH
+        )
+        if fuzzy:
+            await db.execute(select(func.set_config(
+                "pg_trgm.word_similarity_threshold",
+                str(settings.SEARCH_SIMILARITY_THRESHOLD),
+                True,
+            )))
+            fuzzy_counts = await self._count_matches(db, {
+                result_type: [
+                    visible[result_type],
+                    not_(source.model.search_vector.op("@@")(ts_query)),
+                    self._fuzzy_match(source, query_text),
+                ]
+                for result_type, source in SEARCH_SOURCES.items()
+                if source.fuzzy
+            })
+            for result_type, count in fuzzy_counts.items():
+                facets[result_type] += count
+
+        # One ranked stream: full-text hits (tier 0) ahead of fuzzy ones (tier 1), best score first.
+        # Only keys and scores here; display columns are loaded for the returned page afterwards.
+        branches = []
+        for result_type in types:
+            source = SEARCH_SOURCES[result_type]
+            score = func.ts_rank_cd(source.model.search_vector, ts_query, type_=Float)
+            branches.append(
+                select(
+                    literal(0).label("tier"),
+                    literal(result_type).label("type"),
+                    source.model.id.label("id"),
+                    score.label("score"),
+                    (-score).label("rank"),
+                ).where(visible[result_type], source.model.search_vector.op("@@")(ts_query))
+            )
+            if fuzzy and source.fuzzy:
+                similarity = func.word_similarity(query_text, source.title, type_=Float)
+                branches.append(
+                    select(
+                        literal(1).label("tier"),
+                        literal(result_type).label("type"),
+                        source.model.id.label("id"),
+                        similarity.label("score"),
+                        (-similarity).label("rank"),
+                    ).where(
+                        visible[result_type],
+                        not_(source.model.search_vector.op("@@")(ts_query)),
+                        self._fuzzy_match(source, query_text),
+                    )
+                )
+
+        hits = union_all(*branches).subquery()
+        query = select(hits)
+        if cursor:
+            cursor_tier, cursor_rank, cursor_type, cursor_id = decode_cursor(cursor, (int, float, str, int))
+            query = query.where(
+                tuple_(hits.c.tier, hits.c.rank, hits.c.type, hits.c.id)
+                > tuple_(literal(cursor_tier), literal(cursor_rank), literal(cursor_type), literal(cursor_id))
+            )
+        query = query.order_by(hits.c.tier, hits.c.rank, hits.c.type, hits.c.id).limit(limit + 1)
+
+        rows = (await db.execute(query)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last.tier, last.rank, last.type, last.id)
+
+        # Headlines are expensive, so they are generated for this page's rows only
+        details = await self._load_page_details(db, rows, ts_query)
+        results = []
+        for row in rows:
+            detail = details.get((row.type, row.id))
+            if detail is None:
+                # Deleted between the two queries
+                continue
+            results.append(SearchResult(
+                type=row.type,
+                id=row.id,
+                title=detail.title,
+                description=detail.description,
+                snippet=detail.snippet,
+                task_id=detail.task_id,
+                score=row.score,
+            ))
+
+        return SearchResponse(
+            results=results,
+            total=sum(facets[result_type] for result_type in types),
+            facets=facets,
+            next_cursor=next_cursor,
+        )
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased word tokens; no stemming or stop words."""
+    return _TOKEN_RE.findall(text.casefold()) if text else []
+
+
+class _Document(NamedTuple):
+    type: str
+    id: int
+    title: str
+    body: Optional[str]
+    task_id: Optional[int]
+    term_counts: Tuple[Tuple[str, float], ...]
+
+
+class InMemorySearchBackend(SearchBackend):
+    """BM25 over a process-local inverted index.
+
+    Each term maps to two parallel arrays (document numbers, term frequencies),
+    which NumPy scores without copying. Updates append a new document number and
+    tombstone the old one; the index is compacted once tombstones outnumber live
+    documents. Every process holds its own index, so this is meant for single
+    process local/test deployments. Like plainto_tsquery, all query terms must
+    match.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    TITLE_WEIGHT = 2.0  # Title tokens count this many times towards term frequency
+    COMPACT_MIN_TOMBSTONES = 1024
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self) -> None:
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._doc_freq: Counter = Counter()
+        self._docs: List[Optional[_Document]] = []
+        self._doc_numbers: Dict[Tuple[str, int], int] = {}
+        self._lengths = array("f")
+        self._alive = bytearray()
+        self._type_codes = bytearray()
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._doc_numbers)
+
+    def index_document(
+        self,
+        result_type: str,
+        entity_id: int,
+        title: Optional[str],
+        body: Optional[str],
+        task_id: Optional[int] = None,
+    ) -> None:
+        self.remove_document(result_type, entity_id)
+
+        term_counts = Counter()
+        for token in tokenize(title):
+            term_counts[token] += self.TITLE_WEIGHT
+        for token in tokenize(body):
+            term_counts[token] += 1.0
+        self._add(_Document(result_type, entity_id, title or "", body, task_id, tuple(term_counts.items())))
+
+    def _add(self, document: _Document) -> None:
+        number = len(self._docs)
+        self._docs.append(document)
+        self._doc_numbers[(document.type, document.id)] = number
+
+        length = 0.0
+        for term, count in document.term_counts:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("i"), array("f"))
+            postings[0].append(number)
+            postings[1].append(count)
+            self._doc_freq[term] += 1
+            length += count
+
+        self._lengths.append(length)
+        self._alive.append(1)
+        self._type_codes.append(list(SEARCH_SOURCES).index(document.type))
+        self._total_length += length
+
+    def remove_document(self, result_type: str, entity_id: int) -> None:
+        number = self._doc_numbers.pop((result_type, entity_id), None)
+        if number is None:
+            return
+        document = self._docs[number]
+        self._docs[number] = None
+        self._alive[number] = 0
+        self._total_length -= self._lengths[number]
+        for term, _ in document.term_counts:
+            self._doc_freq[term] -= 1
+
+        if len(self._docs) - len(self._doc_numbers) > max(self.COMPACT_MIN_TOMBSTONES, len(self._doc_numbers)):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rebuild the postings from the live documents only."""
+        live = [document for document in self._docs if document is not None]
+        self._reset()
+        for document in live:
+            self._add(document)
+
+    def rank(self, q: str, types: Sequence[str]) -> List[Tuple[float, str, int]]:
+        """Every document of the given types matching all terms of q, as (score, type, id), best first."""
+        terms = list(dict.fromkeys(tokenize(q)))
+        live_count = len(self._doc_numbers)
+        if not terms or not live_count or any(self._doc_freq[term] <= 0 for term in terms):
+            return []
+
+        size = len(self._docs)
+        average_length = self._total_length / live_count
+        lengths = np.frombuffer(self._lengths, dtype=np.float32)
+        scores = np.zeros(size, dtype=np.float64)
+        matched = np.zeros(size, dtype=np.int32)
+
+        for term in terms:
+            numbers_buffer, counts_buffer = self._postings[term]
+            numbers = np.frombuffer(numbers_buffer, dtype=np.int32)
+            counts = np.frombuffer(counts_buffer, dtype=np.float32)
+            doc_freq = self._doc_freq[term]
+            idf = math.log(1.0 + (live_count - doc_freq + 0.5) / (doc_freq + 0.5))
+            norms = self.K1 * (1.0 - self.B + self.B * lengths[numbers] / average_length)
+            # A term occurs once per document in its postings, so plain fancy-index adds are safe
+            scores[numbers] += idf * counts * (self.K1 + 1.0) / (counts + norms)
+            matched[numbers] += 1
+
+        type_codes = [list(SEARCH_SOURCES).index(result_type) for result_type in types]
+        keep = (
+            (matched == len(terms))
+            & (np.frombuffer(self._alive, dtype=np.uint8) == 1)
+            & np.isin(np.frombuffer(self._type_codes, dtype=np.uint8), type_codes)
+        )
+        candidates = np.nonzero(keep)[0]
+
+        hits = [
+            (float(score), self._docs[number].type, self._docs[number].id)
+            for number, score in zip(candidates.tolist(), scores[candidates].tolist())
+        ]
+        hits.sort(key=lambda hit: (-hit[0], hit[1], hit[2]))
+        return hits
+
+    @staticmethod
+    async def _visible_ids(db: AsyncSession, user: User, hits) -> set:
+        """The (type, id) pairs among hits the user may see, in one round trip.
+
+        Facets need every hit checked, so each type's ids go in as one array parameter;
+        an IN list of a common term's hits would exceed the 32767 bind parameter limit.
+        """
+        ids_by_type: Dict[str, List[int]] = {}
+        for _, result_type, entity_id in hits:
+            ids_by_type.setdefault(result_type, []).append(entity_id)
+        if not ids_by_type:
+            return set()
+
+        branches = [
+            select(literal(result_type).label("type"), SEARCH_SOURCES[result_type].model.id.label("id"))
+            .where(
+                SEARCH_SOURCES[result_type].model.id == any_(literal(ids, ARRAY(Integer))),
+                SEARCH_SOURCES[result_type].visibility(user),
+            )
+            for result_type, ids in ids_by_type.items()
+        ]
+        result = await db.execute(union_all(*branches))
+        return {(row.type, row.id) for row in result.all()}
+
+    def _snippet(self, body: Optional[str], q: str, max_words: int = 35) -> Optional[str]:
+        """Up to max_words HTML-escaped words of body starting a little before the first match, terms wrapped in <b>."""
+        if not body:
+            return None
+        terms = set(tokenize(q))
+        words = body.split()
+        first = next(
+            (index for index, word in enumerate(words) if terms.intersection(tokenize(word))),
+            0,
+        )
+        start = max(first - 5, 0)
+        parts = []
+        for word in words[start:start + max_words]:
+            escaped = html.escape(word, quote=False)
+            parts.append(f"<b>{escaped}</b>" if terms.intersection(tokenize(word)) else escaped)
+        return " ".join(parts)
+
+    async def search(
+        self,
+        db: AsyncSession,
+        user: User,
+        q: str,
+        types: Sequence[str],
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> SearchResponse:
+        hits = self.rank(q, list(SEARCH_SOURCES))
+        visible = await self._visible_ids(db, user, hits)
+        hits = [hit for hit in hits if (hit[1], hit[2]) in visible]
+
+        facets = dict.fromkeys(SEARCH_SOURCES, 0)
+        for _, result_type, _ in hits:
+            facets[result_type] += 1
+
+        hits = [hit for hit in hits if hit[1] in types]
+        if cursor:
+            # Same cursor layout as the Postgres backend, which has a fuzzy tier 1
+            _, cursor_rank, cursor_type, cursor_id = decode_cursor(cursor, (int, float, str, int))
+            after = (cursor_rank, cursor_type, cursor_id)
+            hits = [hit for hit in hits if (-hit[0], hit[1], hit[2]) > after]
+
+        page = hits[:limit]
+        next_cursor = None
+        if len(hits) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor(0, -last[0], last[1], last[2])
+
+        results = []
+        for score, result_type, entity_id in page:
+            document = self._docs[self._doc_numbers[(result_type, entity_id)]]
+            title = document.title
+            if document.task_id is not None:
+                task_number = self._doc_numbers.get(("task", document.task_id))
+                title = self._docs[task_number].title if task_number is not None else ""
+            results.append(SearchResult(
+                type=result_type,
+                id=entity_id,
+                title=title,
+                description=document.body,
+                snippet=self._snippet(document.body, q),
+                task_id=document.task_id,
+                score=score,
+            ))
+
+        return SearchResponse(
+            results=results,
+            total=sum(facets[result_type] for result_type in types),
+            facets=facets,
+            next_cursor=next_cursor,
+        )
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        self._reset()
+        for result_type, source in SEARCH_SOURCES.items():
+            # A hit shown under its task's title (comments) has no title of its own to index
+            own_title = source.title if source.task_id is None else literal(None, String)
+            task_id = source.task_id if source.task_id is not None else literal(None, Integer)
+            result = await db.execute(select(source.model.id, own_title, source.body, task_id))
+            for entity_id, title, body, parent_task_id in result.all():
+                self.index_document(result_type, entity_id, title, body, parent_task_id)
+
+
+# Columns copied into the in-memory index per model: (type, own title, body, task id)
+_INDEXED_FIELDS = {
+    Task: ("task", "title", "description", None),
+    Event: ("event", "title", "description", None),
+    TaskComment: ("comment", None, "content", "task_id"),
+    Project: ("project", "name", "description", None),
+}
+
+_PENDING_KEY = "search_index_pending"
+
+
+def _collect_index_changes(session: Session, flush_context) -> None:
+    """Record searchable rows written by this flush; applied only once the transaction commits."""
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for instance in list(session.new) + list(session.dirty):
+        fields = _INDEXED_FIELDS.get(type(instance))
+        if fields is None:
+            continue
+        result_type, title_key, body_key, task_id_key = fields
+        # Read loaded values only; touching an unloaded attribute here would emit SQL
+        state = inspect(instance).dict
+        if body_key not in state or (title_key and title_key not in state):
+            continue
+        pending.append((
+            "index",
+            result_type,
+            instance.id,
+            state.get(title_key) if title_key else None,
+            state.get(body_key),
+            state.get(task_id_key) if task_id_key else None,
+        ))
+    for instance in session.deleted:
+        fields = _INDEXED_FIELDS.get(type(instance))
+        if fields is not None:
+            pending.append(("remove", fields[0], inspect(instance).identity[0]))
+
+
+def _apply_index_changes(session: Session) -> None:
+    backend = get_search_backend()
+    for change in session.info.pop(_PENDING_KEY, []):
+        if change[0] == "index":
+            backend.index_document(*change[1:])
+        else:
+            backend.remove_document(*change[1:])
+
+
+def _discard_index_changes(session: Session, *args) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def install_index_hooks() -> None:
+    """Keep the in-memory index current with ORM writes (bulk Core statements are not seen)."""
+    if not event.contains(Session, "after_flush", _collect_index_changes):
+        event.listen(Session, "after_flush", _collect_index_changes)
+        event.listen(Session, "after_commit", _apply_index_changes)
+        event.listen(Session, "after_soft_rollback", _discard_index_changes)
+
+
+_backend: Optional[SearchBackend] = None
+
+
+def get_search_backend() -> SearchBackend:
+    """The process-wide backend selected by SEARCH_BACKEND ("postgres" or "memory")."""
+    global _backend
+    if _backend is None:
+        if settings.SEARCH_BACKEND == "memory":
+            _backend = InMemorySearchBackend()
+            install_index_hooks()
+        else:
+            _backend = PostgresSearchBackend()
+    return _backend
@@ -0,0 +1,111 @@
+"""
+Task hydration helpers
+Load the related rows of many tasks with one query per relation instead of one per task
+"""
+from typing import Dict, List, Sequence
+from collections import defaultdict
+from sqlalchemy import select, func, any_, literal, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import User
+from app.models.task import Task, TaskAssignee, TaskComment
+from app.schemas.task import TaskResponse, TaskAssigneeResponse, TaskCommentResponse
+
+
+def _any_id(task_ids: Sequence[int]):
+    """ANY over one int[] parameter: stays under the bind parameter limit and keeps one plan for any list size."""
+    return any_(literal(list(task_ids), ARRAY(Integer)))
+
+
+async def load_assignees(db: AsyncSession, task_ids: Sequence[int]) -> Dict[int, List[TaskAssigneeResponse]]:
+    """Load the assignees of the given tasks, grouped by task id."""
+    assignees: Dict[int, List[TaskAssigneeResponse]] = defaultdict(list)
+    if not task_ids:
+        return assignees
+
+    result = await db.execute(
+        select(TaskAssignee, User.full_name, User.email)
+        .outerjoin(User, User.id == TaskAssignee.user_id)
+        .where(TaskAssignee.task_id == _any_id(task_ids))
+        .order_by(TaskAssignee.task_id, TaskAssignee.id)
+    )
+    for assignee, full_name, email in result.all():
+        assignees[assignee.task_id].append(
+            TaskAssigneeResponse(
+                id=assignee.id,
+                user_id=assignee.user_id,
+                user_name=full_name,
+                user_email=email,
+                role=assignee.role,
+            )
+        )
+    return assignees
+
+
+async def load_comment_counts(db: AsyncSession, task_ids: Sequence[int]) -> Dict[int, int]:
+    """Count the comments of the given tasks with a single grouped aggregate."""
+    if not task_ids:
+        return {}
+
+    result = await db.execute(
+        select(TaskComment.task_id, func.count(TaskComment.id))
+        .where(TaskComment.task_id == _any_id(task_ids))
+        .group_by(TaskComment.task_id)
+    )
+    return {task_id: count for task_id, count in result.all()}
+
+
+async def load_comments(db: AsyncSession, task_ids: Sequence[int]) -> Dict[int, List[TaskCommentResponse]]:
+    """Load all comments of the given tasks, grouped by task id."""
+    comments: Dict[int, List[TaskCommentResponse]] = defaultdict(list)
+    if not task_ids:
+        return comments
+
+    result = await db.execute(
+        select(TaskComment, User.full_name)
+        .outerjoin(User, User.id == TaskComment.user_id)
+        .where(TaskComment.task_id == _any_id(task_ids))
+        .order_by(TaskComment.task_id, TaskComment.created_at, TaskComment.id)
+    )
+    for comment, full_name in result.all():
+        comments[comment.task_id].append(
+            TaskCommentResponse(
+                id=comment.id,
+                user_id=comment.user_id,
+                user_name=full_name,
+                content=comment.content,
+                mentions=comment.mentions,
+                created_at=comment.created_at,
+            )
+        )
+    return comments
+
+
+async def hydrate_tasks(
+    db: AsyncSession,
+    tasks: Sequence[Task],
+    include_comments: bool = False,
+) -> List[TaskResponse]:
+    """Build TaskResponse objects for a batch of tasks.
+
+    Comments are only embedded when include_comments is set; comment_count is
+    always filled in.
+    """
+    task_ids = [task.id for task in tasks]
+    assignees = await load_assignees(db, task_ids)
+    comment_counts = await load_comment_counts(db, task_ids)
+    comments = await load_comments(db, task_ids) if include_comments else {}
+
+    task_list = []
+    for task in tasks:
+        # Validate from loaded column values only so nothing is ever lazy-loaded
+        task_data = {
+            attr.key: getattr(task, attr.key)
+            for attr in Task.__mapper__.column_attrs
+            if not attr.deferred
+        }
+        task_data["assignees"] = assignees.get(task.id, [])
+        task_data["comments"] = comments.get(task.id, [])
+        task_data["comment_count"] = comment_counts.get(task.id, 0)
+        task_list.append(TaskResponse.model_validate(task_data))
+    return task_list
@@ -0,0 +1,53 @@
+"""
+Timeseries helpers
+Turn sparse daily snapshot rows into dense, gap-filled NumPy series
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+from datetime import date, timedelta
+import numpy as np
+
+
+def day_range(start: date, end: date) -> List[date]:
+    """All days from start to end, inclusive."""
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def dense_series(
+    start: date,
+    end: date,
+    rows: Sequence[Tuple],
+    fields: Sequence[str],
+    initial: Optional[Dict[str, float]] = None,
+) -> Dict[str, np.ndarray]:
+    """Build one array per field over [start, end], forward-filling missing days.
+
+    rows are (day, value_1, ..., value_n) ordered by day. Snapshots hold state, so
+    a day without a snapshot keeps the last known value; days before the first known
+    value use `initial` (or 0).
+    """
+    size = (end - start).days + 1
+    offsets = np.array([(row[0] - start).days for row in rows], dtype=np.int64)
+    values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(fields))
+
+    # For every day, the index of the last snapshot at or before it (-1 if none)
+    last_seen = np.full(size, -1, dtype=np.int64)
+    last_seen[offsets] = np.arange(len(rows))
+    last_seen = np.maximum.accumulate(last_seen)
+    missing = last_seen < 0
+
+    series = {}
+    for column, field in enumerate(fields):
+        filled = values[np.clip(last_seen, 0, None), column] if len(rows) else np.zeros(size)
+        filled = np.where(missing, (initial or {}).get(field, 0.0), filled)
+        series[field] = filled
+    return series
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing moving average; the first days average over the values available so far."""
+    if window <= 1 or values.size == 0:
+        return values.astype(np.float64)
+    cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    ends = np.arange(1, values.size + 1)
+    starts = np.maximum(ends - window, 0)
+    return (cumulative[ends] - cumulative[starts]) / (ends - starts)
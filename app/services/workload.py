@@ -0,0 +1,102 @@
+"""
+Workload matrix
+Accumulate meeting intervals and task estimates into dense users x days hour matrices
+"""
+from typing import Sequence, Tuple
+from datetime import date, datetime, time, timezone
+import numpy as np
+
+HOURS_PER_DAY = 24.0
+
+
+def _hours_since(origin: datetime, values: Sequence[datetime]) -> np.ndarray:
+    """Hours elapsed from origin for each datetime, as a float array."""
+    origin_ts = origin.timestamp()
+    return (np.array([value.timestamp() for value in values], dtype=np.float64) - origin_ts) / 3600.0
+
+
+def meeting_hours(
+    start_day: date,
+    days: int,
+    user_count: int,
+    intervals: Sequence[Tuple[int, datetime, datetime]],
+) -> np.ndarray:
+    """Scatter (row, start, end) intervals into a user_count x days matrix of hours per UTC day.
+
+    Intervals crossing midnight are split across days: partial first and last days are
+    added directly, full days in between through a difference array along the day axis.
+    """
+    matrix = np.zeros((user_count, days), dtype=np.float64)
+    if not intervals:
+        return matrix
+
+    origin = datetime.combine(start_day, time.min, tzinfo=timezone.utc)
+    rows = np.array([interval[0] for interval in intervals], dtype=np.int64)
+    span = days * HOURS_PER_DAY
+    starts = np.clip(_hours_since(origin, [interval[1] for interval in intervals]), 0.0, span)
+    ends = np.clip(_hours_since(origin, [interval[2] for interval in intervals]), 0.0, span)
+
+    keep = ends > starts
+    rows, starts, ends = rows[keep], starts[keep], ends[keep]
+    if rows.size == 0:
+        return matrix
+
+    first_day = np.minimum((starts // HOURS_PER_DAY).astype(np.int64), days - 1)
+    # An interval ending exactly at midnight belongs to the previous day
+    last_day = np.minimum((np.ceil(ends / HOURS_PER_DAY) - 1).astype(np.int64), days - 1)
+    last_day = np.maximum(last_day, first_day)
+
+    single = first_day == last_day
+    np.add.at(matrix, (rows[single], first_day[single]), ends[single] - starts[single])
+
+    multi = ~single
+    if multi.any():
+        m_rows, m_first, m_last = rows[multi], first_day[multi], last_day[multi]
+        np.add.at(matrix, (m_rows, m_first), (m_first + 1) * HOURS_PER_DAY - starts[multi])
+        np.add.at(matrix, (m_rows, m_last), ends[multi] - m_last * HOURS_PER_DAY)
+
+        # Whole days strictly between first and last
+        diff = np.zeros((user_count, days + 1), dtype=np.float64)
+        np.add.at(diff, (m_rows, m_first + 1), HOURS_PER_DAY)
+        np.add.at(diff, (m_rows, m_last), -HOURS_PER_DAY)
+        matrix += np.cumsum(diff[:, :days], axis=1)
+
+    return matrix
+
+
+def task_hours(
+    start_day: date,
+    days: int,
+    user_count: int,
+    tasks: Sequence[Tuple[int, date, date, float]],
+    not_before: date,
+) -> np.ndarray:
+    """Spread (row, first_day, due_day, hours) evenly over the days left to do them, clipped to the window.
+
+    Remaining hours can only be worked from not_before (today) on, so each task is spread
+    from max(first_day, not_before) to its due day; overdue tasks land on that first day.
+    """
+    matrix = np.zeros((user_count, days), dtype=np.float64)
+    if not tasks:
+        return matrix
+
+    rows = np.array([task[0] for task in tasks], dtype=np.int64)
+    first = np.array([(task[1] - start_day).days for task in tasks], dtype=np.int64)
+    last = np.array([(task[2] - start_day).days for task in tasks], dtype=np.int64)
+    hours = np.array([task[3] for task in tasks], dtype=np.float64)
+
+    first = np.maximum(first, (not_before - start_day).days)
+    last = np.maximum(last, first)
+    per_day = hours / (last - first + 1)
+
+    lo = np.clip(first, 0, days)
+    hi = np.clip(last + 1, 0, days)
+    keep = hi > lo
+    if not keep.any():
+        return matrix
+
+    diff = np.zeros((user_count, days + 1), dtype=np.float64)
+    np.add.at(diff, (rows[keep], lo[keep]), per_day[keep])
+    np.add.at(diff, (rows[keep], hi[keep]), -per_day[keep])
+    matrix += np.cumsum(diff[:, :days], axis=1)
+    return matrix
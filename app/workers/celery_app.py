@@ -1,10 +1,12 @@
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import settings
 
 celery_app = Celery(
     "planora",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
+    include=["app.workers.tasks"],
 )
 
 celery_app.conf.update(
@@ -15,3 +17,26 @@ celery_app.conf.update(
     enable_utc=True,
 )
 
+
+celery_app.conf.beat_schedule = {
+    "generate-recurring-tasks": {
+        "task": "app.workers.tasks.generate_recurring_tasks",
+        "schedule": 300.0,  # Every 5 minutes
+    },
+    "refresh-team-metrics": {
+        "task": "app.workers.tasks.refresh_team_metrics",
+        "schedule": 300.0,  # Every 5 minutes
+    },
+    "snapshot-project-metrics": {
+        "task": "app.workers.tasks.snapshot_project_metrics",
+        "schedule": crontab(minute=55),  # Hourly, the 23:55 UTC run closes the day
+    },
+    "maintain-audit-partitions": {
+        "task": "app.workers.tasks.maintain_audit_partitions",
+        "schedule": crontab(minute=30, hour=2),  # Daily
+    },
+    "purge-expired-exports": {
+        "task": "app.workers.tasks.purge_expired_exports",
+        "schedule": crontab(minute=15),  # Hourly
+    },
+}
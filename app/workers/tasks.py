@@ -51,3 +51,448 @@ def process_scheduled_reminders():
     # and send notifications
     pass
 
+
+
+# Recurring templates processed per transaction
+RECURRENCE_BATCH_SIZE = 1000
+# Maximum instances generated per template in one run (catch-up after downtime)
+RECURRENCE_MAX_CATCHUP = 50
+
+
+@celery_app.task
+def generate_recurring_tasks():
+    """Generate due instances of recurring tasks (called by Celery Beat).
+    
+    Only templates whose next_occurrence_at is due are scanned, through a partial
+    index. Each batch is locked with SKIP LOCKED, instances are inserted with one
+    multi-row INSERT ... ON CONFLICT DO NOTHING keyed on (template, occurrence), and
+    the pointers are advanced in the same transaction, so overlapping or repeated
+    runs never create duplicates.
+    """
+    from datetime import datetime, timezone
+    from sqlalchemy import select, update, insert, any_, literal, Integer
+    from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+    from app.core.database import SyncSessionLocal
+    from app.models.task import Task, TaskAssignee, TaskTag, TaskStatus
+    from app.services.recurrence import due_occurrences, next_occurrence
+    
+    now = datetime.now(timezone.utc)
+    templates_processed = 0
+    instances_created = 0
+    
+    while True:
+        with SyncSessionLocal() as db, db.begin():
+            templates = db.execute(
+                select(Task)
+                .where(Task.next_occurrence_at <= now)
+                .order_by(Task.next_occurrence_at)
+                .limit(RECURRENCE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            
+            if not templates:
+                break
+            
+            instance_rows = []
+            pointer_updates = []
+            for template in templates:
+                anchor = template.due_date or template.created_at or template.next_occurrence_at
+                occurrences = due_occurrences(
+                    template.recurrence,
+                    anchor,
+                    template.next_occurrence_at,
+                    now,
+                    RECURRENCE_MAX_CATCHUP,
+                ) if template.recurrence else []
+                
+                for occurrence in occurrences:
+                    instance_rows.append({
+                        "project_id": template.project_id,
+                        "parent_id": template.parent_id,
+                        "title": template.title,
+                        "description": template.description,
+                        "status": TaskStatus.TODO,
+                        "priority": template.priority,
+                        "due_date": occurrence,
+                        "estimate": template.estimate,
+                        "spent": 0.0,
+                        "tags": template.tags,
+                        "attachments": template.attachments,
+                        "task_metadata": template.task_metadata,
+                        "recurrence_template_id": template.id,
+                        "occurrence_at": occurrence,
+                    })
+                
+                # Continue after the last generated occurrence, or after now if nothing was due
+                after = occurrences[-1] if occurrences else now
+                pointer_updates.append({
+                    "id": template.id,
+                    "next_occurrence_at": next_occurrence(template.recurrence, anchor, after),
+                })
+            
+            new_ids = []
+            if instance_rows:
+                result = db.execute(
+                    pg_insert(Task)
+                    .values(instance_rows)
+                    .on_conflict_do_nothing(
+                        index_elements=[Task.recurrence_template_id, Task.occurrence_at]
+                    )
+                    .returning(Task.id)
+                )
+                new_ids = list(result.scalars().all())
+            
+            if new_ids:
+                new_ids_param = any_(literal(new_ids, ARRAY(Integer)))
+                # Copy assignees and tags of each template with set-based INSERT ... SELECT
+                db.execute(
+                    insert(TaskAssignee).from_select(
+                        ["task_id", "user_id", "role"],
+                        select(Task.id, TaskAssignee.user_id, TaskAssignee.role)
+                        .join(TaskAssignee, TaskAssignee.task_id == Task.recurrence_template_id)
+                        .where(Task.id == new_ids_param),
+                    )
+                )
+                db.execute(
+                    insert(TaskTag).from_select(
+                        ["task_id", "tag_id"],
+                        select(Task.id, TaskTag.tag_id)
+                        .join(TaskTag, TaskTag.task_id == Task.recurrence_template_id)
+                        .where(Task.id == new_ids_param),
+                    )
+                )
+            
+            # Advance all pointers of the batch (bulk UPDATE by primary key)
+            db.execute(update(Task), pointer_updates)
+            
+            templates_processed += len(templates)
+            instances_created += len(new_ids)
+    
+    return {"templates": templates_processed, "instances": instances_created}
+
+
+@celery_app.task
+def refresh_team_metrics(days: int = 2):
+    """Rebuild the team metric aggregates for the last `days` UTC days (called by Celery Beat).
+    
+    Each run recomputes the recent rows with set-based INSERT ... SELECT ... GROUP BY
+    upserts, so the team dashboard only reads a handful of pre-aggregated rows.
+    Run with a larger `days` once to backfill history.
+    """
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import select, update, func, literal, union_all, cast, Date, Float, Integer
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    from app.core.database import SyncSessionLocal
+    from app.models.task import Task, TaskStatus
+    from app.models.project import Project
+    from app.models.calendar import Event
+    from app.models.resource import Resource
+    from app.models.user import User
+    from app.models.metrics import TeamDailyMetrics, ResourceDailyBooking
+    
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    since_day = today - timedelta(days=max(days, 1) - 1)
+    since = datetime.combine(since_day, datetime.min.time(), tzinfo=timezone.utc)
+    
+    def utc_day(column):
+        return cast(func.timezone("UTC", column), Date)
+    
+    def hours_between(start, end):
+        return func.extract("epoch", end - start) / 3600.0
+    
+    with SyncSessionLocal() as db, db.begin():
+        # Reset the window first so rows that lost all their tasks drop to zero
+        db.execute(
+            update(TeamDailyMetrics)
+            .where(TeamDailyMetrics.day >= since_day)
+            .values(tasks_created=0, tasks_completed=0, lead_time_hours_sum=0.0, active_tasks=None)
+        )
+        db.execute(
+            update(ResourceDailyBooking)
+            .where(ResourceDailyBooking.day >= since_day)
+            .values(booked_hours=0.0)
+        )
+        
+        # Created and completed tasks per team and day
+        created = (
+            select(
+                Project.team_id.label("team"),
+                utc_day(Task.created_at).label("day"),
+                literal(1).label("created"),
+                literal(0).label("completed"),
+                cast(literal(0.0), Float).label("lead_time"),
+            )
+            .join(Project, Project.id == Task.project_id)
+            .where(Task.created_at >= since, Project.team_id.isnot(None))
+        )
+        completed = (
+            select(
+                Project.team_id.label("team"),
+                utc_day(Task.completed_at).label("day"),
+                literal(0).label("created"),
+                literal(1).label("completed"),
+                cast(hours_between(Task.created_at, Task.completed_at), Float).label("lead_time"),
+            )
+            .join(Project, Project.id == Task.project_id)
+            .where(Task.completed_at >= since, Project.team_id.isnot(None))
+        )
+        events = union_all(created, completed).subquery()
+        daily = (
+            select(
+                events.c.team,
+                events.c.day,
+                cast(func.sum(events.c.created), Integer),
+                cast(func.sum(events.c.completed), Integer),
+                func.sum(events.c.lead_time),
+            )
+            .group_by(events.c.team, events.c.day)
+        )
+        stmt = pg_insert(TeamDailyMetrics).from_select(
+            ["team", "day", "tasks_created", "tasks_completed", "lead_time_hours_sum"],
+            daily,
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_team_daily_metrics_team_day",
+                set_={
+                    "tasks_created": stmt.excluded.tasks_created,
+                    "tasks_completed": stmt.excluded.tasks_completed,
+                    "lead_time_hours_sum": stmt.excluded.lead_time_hours_sum,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+        
+        # Snapshot of open tasks per team on today's row; every team with projects gets one, 0 included
+        active = (
+            select(
+                Project.team_id,
+                literal(today, Date),
+                cast(func.count(Task.id).filter(Task.status != TaskStatus.DONE), Integer),
+            )
+            .outerjoin(Task, Task.project_id == Project.id)
+            .where(Project.team_id.isnot(None))
+            .group_by(Project.team_id)
+        )
+        stmt = pg_insert(TeamDailyMetrics).from_select(["team", "day", "active_tasks"], active)
+        db.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_team_daily_metrics_team_day",
+                set_={"active_tasks": stmt.excluded.active_tasks, "updated_at": func.now()},
+            )
+        )
+        
+        # Hours booked on resource calendars, attributed to the booking user's team
+        bookings = (
+            select(
+                Resource.id,
+                User.team,
+                utc_day(Event.start),
+                func.sum(hours_between(Event.start, Event.end)),
+            )
+            .join(Resource, Resource.calendar_id == Event.calendar_id)
+            .join(User, User.id == Event.creator_id)
+            .where(Event.start >= since, User.team.isnot(None))
+            .group_by(Resource.id, User.team, utc_day(Event.start))
+        )
+        stmt = pg_insert(ResourceDailyBooking).from_select(
+            ["resource_id", "team", "day", "booked_hours"],
+            bookings,
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_resource_daily_bookings_resource_team_day",
+                set_={"booked_hours": stmt.excluded.booked_hours, "updated_at": func.now()},
+            )
+        )
+    
+    return {"since": since_day.isoformat()}
+
+
+@celery_app.task
+def snapshot_project_metrics():
+    """Write today's per-project task snapshot (called by Celery Beat).
+    
+    One INSERT ... SELECT ... GROUP BY over tasks; re-running on the same day
+    overwrites that day's row, so the last run of the day becomes its close.
+    """
+    from datetime import datetime, timezone
+    from sqlalchemy import select, func, literal, cast, Date, Integer, Float
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    from app.core.database import SyncSessionLocal
+    from app.models.task import Task, TaskStatus
+    from app.models.metrics import ProjectDailySnapshot
+    
+    today = datetime.now(timezone.utc).date()
+    
+    def status_count(task_status):
+        return cast(func.count(Task.id).filter(Task.status == task_status), Integer)
+    
+    snapshot = (
+        select(
+            Task.project_id,
+            literal(today, Date),
+            status_count(TaskStatus.TODO),
+            status_count(TaskStatus.IN_PROGRESS),
+            status_count(TaskStatus.BLOCKED),
+            status_count(TaskStatus.DONE),
+            cast(func.coalesce(func.sum(Task.estimate).filter(Task.status != TaskStatus.DONE), 0.0), Float),
+            cast(func.coalesce(func.sum(Task.spent), 0.0), Float),
+        )
+        .where(Task.project_id.isnot(None))
+        .group_by(Task.project_id)
+    )
+    stmt = pg_insert(ProjectDailySnapshot).from_select(
+        [
+            "project_id",
+            "day",
+            "todo_count",
+            "in_progress_count",
+            "blocked_count",
+            "done_count",
+            "remaining_estimate",
+            "spent",
+        ],
+        snapshot,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_project_daily_snapshots_project_day",
+        set_={
+            "todo_count": stmt.excluded.todo_count,
+            "in_progress_count": stmt.excluded.in_progress_count,
+            "blocked_count": stmt.excluded.blocked_count,
+            "done_count": stmt.excluded.done_count,
+            "remaining_estimate": stmt.excluded.remaining_estimate,
+            "spent": stmt.excluded.spent,
+            "updated_at": func.now(),
+        },
+    )
+    
+    with SyncSessionLocal() as db, db.begin():
+        result = db.execute(stmt)
+    
+    return {"day": today.isoformat(), "projects": result.rowcount}
+
+
+@celery_app.task
+def maintain_audit_partitions():
+    """Create upcoming audit_logs partitions and archive expired ones (called by Celery Beat).
+    
+    Partitions older than AUDIT_RETENTION_MONTHS are written to gzip JSONL files
+    under AUDIT_ARCHIVE_DIR, then detached and dropped in the same transaction.
+    """
+    from datetime import datetime, timezone
+    from app.core.database import sync_engine
+    from app.services.audit_partitions import create_initial_partitions, apply_retention
+    
+    with sync_engine.begin() as conn:
+        created = create_initial_partitions(conn)
+    
+    # Archives are written before the drop commits, so a failure leaves the partition in place
+    with sync_engine.begin() as conn:
+        archived = apply_retention(
+            conn,
+            datetime.now(timezone.utc),
+            settings.AUDIT_RETENTION_MONTHS,
+            settings.AUDIT_ARCHIVE_DIR,
+        )
+    
+    return {"created": created, "archived": archived}
+
+
+@celery_app.task
+def export_user_data_archive(export_id: int):
+    """Build a GDPR export archive for a DataExport row (queued by POST /security/gdpr/exports).
+    
+    Progress is committed after each section so the status endpoint can report it,
+    together with a heartbeat that tells purge_expired_exports the worker is alive.
+    """
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import func, update
+    from app.core.database import SyncSessionLocal, sync_engine
+    from app.models.gdpr import DataExport, DataExportStatus
+    from app.services.gdpr_export import export_path, write_export_archive
+    
+    def set_export(**values):
+        with SyncSessionLocal() as db, db.begin():
+            db.execute(update(DataExport).where(DataExport.id == export_id).values(**values))
+    
+    with SyncSessionLocal() as db:
+        export = db.get(DataExport, export_id)
+        if export is None or export.status != DataExportStatus.PENDING:
+            return {"export_id": export_id, "status": "skipped"}
+        user_id = export.user_id
+    
+    set_export(status=DataExportStatus.RUNNING, error=None, heartbeat_at=func.now())
+    path = export_path(settings.GDPR_EXPORT_DIR, user_id, export_id)
+    try:
+        # One read-only REPEATABLE READ transaction, so all sections come from the same snapshot
+        with sync_engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+            size = write_export_archive(
+                conn, user_id, path, lambda progress: set_export(progress=progress, heartbeat_at=func.now())
+            )
+    except Exception as e:
+        set_export(status=DataExportStatus.FAILED, error=str(e))
+        raise
+    
+    now = datetime.now(timezone.utc)
+    set_export(
+        status=DataExportStatus.COMPLETED,
+        file_path=path,
+        file_size=size,
+        completed_at=now,
+        expires_at=now + timedelta(hours=settings.GDPR_EXPORT_TTL_HOURS),
+    )
+    return {"export_id": export_id, "bytes": size}
+
+
+@celery_app.task
+def purge_expired_exports():
+    """Delete GDPR export archives past their expiry and fail stuck exports (called by Celery Beat).
+    
+    Exports still pending or running with no worker heartbeat (or, if never picked up,
+    no creation) in the last GDPR_EXPORT_TIMEOUT_MINUTES lost their worker or their
+    queued message; marking them failed lets the user start a new one. A live worker
+    refreshes the heartbeat after each section, so its export is left alone.
+    """
+    import os
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import func, select, update
+    from app.core.database import SyncSessionLocal
+    from app.models.gdpr import DataExport, DataExportStatus
+    from app.services.gdpr_export import export_path
+    
+    now = datetime.now(timezone.utc)
+    with SyncSessionLocal() as db, db.begin():
+        stuck = db.execute(
+            update(DataExport)
+            .where(
+                DataExport.status.in_([DataExportStatus.PENDING, DataExportStatus.RUNNING]),
+                func.coalesce(DataExport.heartbeat_at, DataExport.created_at)
+                < now - timedelta(minutes=settings.GDPR_EXPORT_TIMEOUT_MINUTES),
+            )
+            .values(status=DataExportStatus.FAILED, error="Export timed out")
+            .returning(DataExport.id, DataExport.user_id)
+        ).all()
+        # A worker killed mid-export leaves its temporary file behind; live workers were excluded above
+        for export_id, user_id in stuck:
+            partial = export_path(settings.GDPR_EXPORT_DIR, user_id, export_id) + ".partial"
+            if os.path.exists(partial):
+                os.remove(partial)
+        
+        expired = db.execute(
+            select(DataExport.id, DataExport.file_path)
+            .where(DataExport.expires_at < now, DataExport.file_path.isnot(None))
+        ).all()
+        for _, file_path in expired:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        if expired:
+            db.execute(
+                update(DataExport)
+                .where(DataExport.id.in_([export_id for export_id, _ in expired]))
+                .values(file_path=None, file_size=None)
+            )
+    
+    return {"purged": len(expired), "timed_out": len(stuck)}
@@ -0,0 +1,99 @@
+"""
+Latency of a non-auth endpoint while a burst of logins hashes passwords.
+
+Drives the app in-process over ASGI: a probe requests /health every few
+milliseconds while --logins concurrent logins run against one bench user.
+Compare the default password pool with bcrypt on the event loop:
+
+    python -m benchmarks.login_storm --logins 60
+    python -m benchmarks.login_storm --logins 60 --inline
+
+Uses DATABASE_URL; the bench user is deleted at the end.
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+import numpy as np
+
+
+async def probe(client, stop: asyncio.Event, interval: float):
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        await asyncio.sleep(interval)
+    return np.array(latencies)
+
+
+def summary(name: str, latencies) -> str:
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return f"{name:>8}: /health p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  max {latencies.max():7.2f} ms  ({len(latencies)} probes)"
+
+
+async def run(logins: int, interval: float) -> None:
+    import httpx
+    from sqlalchemy import delete
+    from app.main import app
+    from app.middleware.rate_limit import RateLimitMiddleware
+    from app.core.database import AsyncSessionLocal, engine
+    from app.core.password_pool import password_pool
+    from app.models.calendar import Calendar
+    from app.models.user import User
+
+    # Every login comes from one client address, so the login policy would reject the storm itself
+    app.user_middleware = [m for m in app.user_middleware if m.cls is not RateLimitMiddleware]
+    app.middleware_stack = None
+
+    email = f"storm-{uuid.uuid4().hex[:8]}@example.com"
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        response = await client.post("/api/v1/auth/register", json={"email": email, "password": "storm-password"})
+        response.raise_for_status()
+        user_id = response.json()["id"]
+        try:
+            stop = asyncio.Event()
+            quiet = asyncio.create_task(probe(client, stop, interval))
+            await asyncio.sleep(1.0)
+            stop.set()
+            print(summary("idle", await quiet))
+
+            stop = asyncio.Event()
+            loaded = asyncio.create_task(probe(client, stop, interval))
+            started = time.perf_counter()
+            statuses = await asyncio.gather(*[
+                client.post("/api/v1/auth/login", data={"username": email, "password": "storm-password"})
+                for _ in range(logins)
+            ])
+            elapsed = time.perf_counter() - started
+            stop.set()
+            print(summary("storm", await loaded))
+            codes = {}
+            for response in statuses:
+                codes[response.status_code] = codes.get(response.status_code, 0) + 1
+            print(f"{logins} logins in {elapsed:.2f}s, status codes {codes}, pool {password_pool.stats()}")
+        finally:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(Calendar).where(Calendar.owner_id == user_id))
+                await db.execute(delete(User).where(User.id == user_id))
+                await db.commit()
+            await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=60)
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between probes")
+    parser.add_argument("--inline", action="store_true", help="Hash on the event loop, as before the password pool")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure the pool before importing the app
+    os.environ.setdefault("ENVIRONMENT", "benchmark")
+    if args.inline:
+        os.environ["PASSWORD_HASH_WORKERS"] = "0"
+    asyncio.run(run(args.logins, args.interval))
+
+
+if __name__ == "__main__":
+    main()
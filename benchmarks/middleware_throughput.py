@@ -0,0 +1,127 @@
+"""
+Requests per second through the full middleware stack.
+
+Calls the ASGI app directly, without an HTTP client or server in the way, with
+--concurrency requests in flight: /health (exempt from rate limiting and
+audit, so only the middleware plumbing is measured) and an authenticated GET
+of the bench user's calendars (token claims, rate limit, audit context, a
+database query). Run it on a checkout from before and after a middleware
+change to compare:
+
+    python -m benchmarks.middleware_throughput --seconds 5 --concurrency 20
+
+Uses DATABASE_URL; the bench user is deleted at the end. Rate limits are
+raised for the run so the stream is not throttled.
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+
+async def call(app, method: str, path: str, headers) -> int:
+    """One request straight through the ASGI interface; returns the status code."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Only reached once the response is complete
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def throughput(app, path: str, headers, seconds: float, concurrency: int) -> float:
+    deadline = time.perf_counter() + seconds
+    counts = []
+
+    async def worker():
+        done = 0
+        while time.perf_counter() < deadline:
+            status = await call(app, "GET", path, headers)
+            if status != 200:
+                raise RuntimeError(f"GET {path} returned {status}")
+            done += 1
+        counts.append(done)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return sum(counts) / (time.perf_counter() - started)
+
+
+async def run(seconds: float, concurrency: int) -> None:
+    from sqlalchemy import delete
+    from app.main import app
+    from app.core.database import AsyncSessionLocal, engine
+    from app.core.security import create_access_token, get_password_hash
+    from app.models.calendar import Calendar
+    from app.models.user import User
+
+    # Development settings echo every statement, which would dominate the timing
+    engine.sync_engine.echo = False
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"mw-bench-{uuid.uuid4().hex[:8]}@example.com", password_hash=get_password_hash("bench"))
+        db.add(user)
+        await db.flush()
+        db.add(Calendar(owner_id=user.id, name="Bench"))
+        await db.commit()
+        user_id = user.id
+
+    authorization = f"Bearer {create_access_token({'sub': str(user_id)})}".encode()
+    anonymous = [(b"host", b"bench")]
+    authenticated = anonymous + [(b"authorization", authorization)]
+    try:
+        for name, path, headers in (
+            ("/health", "/health", anonymous),
+            ("GET /api/v1/calendars", "/api/v1/calendars", authenticated),
+        ):
+            # Warm caches, the connection pool and prepared statements before timing
+            await throughput(app, path, headers, min(1.0, seconds), concurrency)
+            rate = await throughput(app, path, headers, seconds, concurrency)
+            print(f"{name:>22}: {rate:9.0f} req/s")
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Calendar).where(Calendar.owner_id == user_id))
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0, help="Timed run per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight")
+    args = parser.parse_args()
+
+    # Policies are built at import time, so raise the limits before the app is imported
+    os.environ["RATE_LIMIT_READ_PER_MINUTE"] = "100000000"
+    asyncio.run(run(args.seconds, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
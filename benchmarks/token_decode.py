@@ -0,0 +1,65 @@
+"""
+Per-request JWT verification cost, before and after claims sharing.
+
+The old request path decoded the bearer token twice, in AuditMiddleware and
+in get_current_user, each time attempting an unverified decode (which raised
+on python-jose's signature) before the verified one.
+Now TokenClaimsMiddleware verifies once, through the verified-token cache, and
+both consumers read request.state. Run with:
+
+    python -m benchmarks.token_decode --requests 20000 --users 500
+"""
+import argparse
+import random
+import time
+from jose import jwt
+from app.core.config import settings
+from app.core.security import create_access_token, decode_access_token, _verified_tokens
+
+
+def old_request(token: str) -> dict:
+    """What one authenticated request used to cost, minus the log formatting."""
+    for _ in range(2):
+        try:
+            jwt.decode(token, options={"verify_signature": False})
+        except TypeError:
+            pass
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    return payload
+
+
+def new_request(token: str) -> dict:
+    return decode_access_token(token)
+
+
+def measure(path, tokens) -> float:
+    started = time.process_time()
+    for token in tokens:
+        path(token)
+    return (time.process_time() - started) / len(tokens) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=500, help="Distinct tokens in the request stream")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    users = [create_access_token({"sub": str(user_id)}) for user_id in range(1, args.users + 1)]
+    tokens = [rng.choice(users) for _ in range(args.requests)]
+
+    old_us = measure(old_request, tokens)
+    _verified_tokens.clear()
+    cold_us = measure(new_request, users)
+    _verified_tokens.clear()
+    new_us = measure(new_request, tokens)
+    print(f"old path (2 decodes):       {old_us:8.1f} us CPU/request")
+    print(f"new path, first sight:      {cold_us:8.1f} us CPU/request")
+    print(f"new path, mixed stream:     {new_us:8.1f} us CPU/request")
+    print(f"saved:                      {old_us - new_us:8.1f} us CPU/request ({old_us / new_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
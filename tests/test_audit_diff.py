@@ -0,0 +1,71 @@
+"""
+Tests for field-level audit diffs built from ORM attribute history.
+"""
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.models.audit import AuditAction
+from app.models.task import Task, TaskStatus
+from app.models.user import User, UserRole
+from app.services.audit_diff import (
+    AuditContext,
+    audit_context,
+    _collect_audit_diffs,
+    _discard_audit_records,
+    _forget_savepoints,
+    _mark_savepoint,
+    _PENDING_KEY,
+    _RECORDS_KEY,
+)
+
+
+def test_diff_reports_changed_allowed_fields_only():
+    """Updates report old -> new for changed columns; denied and non-allowed columns never appear."""
+    token = audit_context.set(AuditContext(1, None, None))
+    try:
+        session = Session()
+        task = Task(id=10, title="Old title", status=TaskStatus.TODO, spent=0.0)
+        user = User(id=20, email="a@example.com", password_hash="x", role=UserRole.USER, preferences={})
+        for instance in (task, user):
+            make_transient_to_detached(instance)
+            session.add(instance)
+        task.title = "New title"
+        task.status = TaskStatus.DONE
+        user.password_hash = "y"
+        user.preferences = {"theme": "dark"}
+        user.role = UserRole.MANAGER
+
+        _collect_audit_diffs(session, None, None)
+        entries = {entity_type: (entity_id, action, diff) for entity_type, entity_id, action, diff in session.info[_PENDING_KEY]}
+    finally:
+        audit_context.reset(token)
+
+    assert entries["tasks"] == (10, AuditAction.UPDATE, {
+        "title": {"old": "Old title", "new": "New title"},
+        "status": {"old": "todo", "new": "done"},
+    })
+    assert entries["users"] == (20, AuditAction.UPDATE, {"role": {"old": "user", "new": "manager"}})
+
+
+class _Transaction:
+    """Stands in for a SessionTransaction: hashable, with nested and parent."""
+
+    def __init__(self, nested, parent):
+        self.nested = nested
+        self.parent = parent
+
+
+def test_savepoint_rollback_discards_only_its_own_records():
+    """Records of a rolled-back savepoint are dropped; the outer transaction's survive until it rolls back."""
+    session = Session()
+    outer = _Transaction(nested=False, parent=None)
+    savepoint = _Transaction(nested=True, parent=outer)
+    session.info[_RECORDS_KEY] = [{"entity_id": 1}]
+
+    _mark_savepoint(session, savepoint)
+    session.info[_RECORDS_KEY].append({"entity_id": 2})
+    # SQLAlchemy ends the transaction before it fires after_soft_rollback
+    _forget_savepoints(session, savepoint)
+    _discard_audit_records(session, savepoint)
+    assert session.info[_RECORDS_KEY] == [{"entity_id": 1}]
+
+    _discard_audit_records(session, outer)
+    assert _RECORDS_KEY not in session.info
@@ -0,0 +1,23 @@
+"""
+Tests for the overflow handling of the batched audit writer.
+"""
+import asyncio
+from app.services.audit_writer import AuditWriter
+
+
+def test_block_policy_drops_overflow_from_synchronous_callers():
+    """Synchronous callers cannot wait for room, so a full queue drops and counts their records."""
+    async def fill():
+        writer = AuditWriter(max_queue=2, batch_size=10, flush_interval=1.0, overflow="block")
+        for number in range(5):
+            writer.submit_nowait({"entity_id": number})
+        stats = writer.stats()
+        # The flush task has not run yet; stop it before it writes anything
+        writer._task.cancel()
+        await asyncio.gather(writer._task, return_exceptions=True)
+        return stats, len(asyncio.all_tasks())
+
+    stats, pending_tasks = asyncio.run(fill())
+    assert stats["queued"] == 2
+    assert stats["dropped"] == 3
+    assert pending_tasks == 1
@@ -0,0 +1,28 @@
+"""
+Tests for the keyset pagination cursors.
+"""
+from datetime import datetime, timezone
+import pytest
+from fastapi import HTTPException
+from app.core.pagination import encode_cursor, decode_cursor, parse_cursor_datetime
+
+
+def test_cursor_round_trip_converts_values():
+    """Test that decoded values come back with the requested types."""
+    created_at = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+    cursor = encode_cursor(created_at, 42)
+    assert decode_cursor(cursor, (parse_cursor_datetime, int)) == [created_at, 42]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    encode_cursor("2026-03-01T12:30:00+00:00"),
+    encode_cursor("2026-03-01T12:30:00+00:00", "abc"),
+    encode_cursor("yesterday", 42),
+    encode_cursor(None, None),
+])
+def test_malformed_cursor_is_a_bad_request(cursor):
+    """Test that wrong sizes and values that do not convert are a 400, not a server error."""
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor, (parse_cursor_datetime, int))
+    assert raised.value.status_code == 400
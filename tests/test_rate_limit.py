@@ -0,0 +1,121 @@
+"""
+Tests for the rate limiting middleware and the in-process GCRA fallback of the rate limiter.
+"""
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse
+from app.core import rate_limit
+from app.core.rate_limit import RateLimitDecision, RateLimitPolicy
+from app.middleware import rate_limit as rate_limit_middleware
+from app.middleware.rate_limit import (
+    LOGIN_POLICY,
+    READ_POLICY,
+    REGISTER_POLICY,
+    WRITE_POLICY,
+    RateLimitMiddleware,
+    policy_for,
+)
+
+
+async def _ok(scope, receive, send):
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+def _client(claims=None) -> TestClient:
+    """A client for RateLimitMiddleware around a trivial app, with token claims as TokenClaimsMiddleware sets them."""
+    middleware = RateLimitMiddleware(_ok)
+
+    async def app(scope, receive, send):
+        if claims is not None:
+            scope.setdefault("state", {})["token_claims"] = claims
+        await middleware(scope, receive, send)
+
+    return TestClient(app)
+
+
+def _record_checks(monkeypatch, decision: RateLimitDecision) -> list:
+    """Replace the limiter with one returning decision; returns the (key, policy) pairs it was asked about."""
+    checks = []
+
+    async def check_rate_limit(key, policy):
+        checks.append((key, policy))
+        return decision
+
+    monkeypatch.setattr(rate_limit_middleware, "check_rate_limit", check_rate_limit)
+    return checks
+
+
+def test_policy_for_routes_auth_to_strict_policies_and_exempts_health_and_docs():
+    """Login and register have their own policies; health, docs and preflight are not limited."""
+    assert policy_for("POST", "/api/v1/auth/login") is LOGIN_POLICY
+    assert policy_for("POST", "/api/v1/auth/register") is REGISTER_POLICY
+    assert policy_for("GET", "/api/v1/tasks") is READ_POLICY
+    assert policy_for("PATCH", "/api/v1/tasks/1") is WRITE_POLICY
+    for path in ("/health", "/api/docs", "/api/redoc", "/api/openapi.json"):
+        assert policy_for("GET", path) is None
+    assert policy_for("OPTIONS", "/api/v1/tasks") is None
+
+
+def test_blocked_request_gets_json_429_with_retry_after(monkeypatch):
+    """A denied request is answered by the middleware with a JSON 429, not passed on or turned into a 500."""
+    _record_checks(monkeypatch, RateLimitDecision(allowed=False, remaining=0, retry_after=2.3))
+
+    response = _client().get("/api/v1/tasks")
+
+    assert response.status_code == 429
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"detail": "Rate limit exceeded. Please try again later."}
+    assert response.headers["Retry-After"] == "3"
+    assert response.headers["X-RateLimit-Limit"] == str(READ_POLICY.limit)
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+
+def test_allowed_request_passes_through_with_limit_headers(monkeypatch):
+    """Allowed requests reach the app and carry the remaining budget; exempt paths skip the limiter."""
+    checks = _record_checks(monkeypatch, RateLimitDecision(allowed=True, remaining=7, retry_after=0.0))
+    client = _client()
+
+    response = client.get("/api/v1/tasks")
+    assert response.status_code == 200
+    assert response.text == "ok"
+    assert response.headers["X-RateLimit-Remaining"] == "7"
+
+    assert client.get("/health").status_code == 200
+    assert len(checks) == 1
+
+
+def test_keys_by_user_when_authenticated_and_by_address_otherwise(monkeypatch):
+    """Per-user policies use the token subject; anonymous callers and login attempts use the client address."""
+    checks = _record_checks(monkeypatch, RateLimitDecision(allowed=True, remaining=1, retry_after=0.0))
+
+    _client(claims={"sub": "42"}).get("/api/v1/tasks")
+    _client(claims={"sub": "42"}).post("/api/v1/auth/login")
+    _client().get("/api/v1/tasks")
+
+    assert checks == [
+        ("user:42", READ_POLICY),
+        ("ip:testclient", LOGIN_POLICY),
+        ("ip:testclient", READ_POLICY),
+    ]
+
+
+def test_gcra_allows_burst_then_spaces_requests(monkeypatch):
+    """A full burst passes, the next request waits one emission interval, and budget refills over time."""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    rate_limit._local.clear()
+    policy = RateLimitPolicy("test", limit=5, period=10.0, per_user=False)
+
+    decisions = [rate_limit._check_local("ip:1", policy) for _ in range(5)]
+    assert all(decision.allowed for decision in decisions)
+    assert [decision.remaining for decision in decisions] == [4, 3, 2, 1, 0]
+
+    blocked = rate_limit._check_local("ip:1", policy)
+    assert not blocked.allowed
+    assert blocked.retry_after == 2.0
+
+    # Other keys keep their own budget
+    assert rate_limit._check_local("ip:2", policy).allowed
+
+    now[0] += 2.0
+    assert rate_limit._check_local("ip:1", policy).allowed
+    assert not rate_limit._check_local("ip:1", policy).allowed
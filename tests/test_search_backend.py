@@ -0,0 +1,48 @@
+"""Tests for the in-memory BM25 search index."""
+from app.services.search_backend import InMemorySearchBackend
+
+
+def _backend():
+    backend = InMemorySearchBackend()
+    backend.index_document("task", 1, "Ordinare asfalto", "fornitore asfalto zona nord")
+    backend.index_document("task", 2, "Riunione fornitori", "discutere prezzi asfalto e ghiaia")
+    backend.index_document("event", 3, "Sopralluogo cantiere", "controllo asfalto")
+    backend.index_document("comment", 4, None, "il fornitore conferma la consegna", task_id=1)
+    return backend
+
+
+def test_rank_requires_all_terms_and_prefers_title_matches():
+    """Test AND matching and the title weight."""
+    backend = _backend()
+    hits = backend.rank("asfalto", ["task", "event"])
+    assert [(hit[1], hit[2]) for hit in hits] == [("task", 1), ("event", 3), ("task", 2)]
+    assert [hit[2] for hit in backend.rank("asfalto ghiaia", ["task"])] == [2]
+    assert backend.rank("asfalto cemento", ["task", "event"]) == []
+
+
+def test_rank_filters_types():
+    """Test that only the requested types are returned."""
+    backend = _backend()
+    assert [hit[1] for hit in backend.rank("fornitore", ["comment"])] == ["comment"]
+
+
+def test_reindex_and_remove_replace_postings():
+    """Test that updates and deletions take effect, including after compaction."""
+    backend = _backend()
+    backend.index_document("task", 1, "Ordinare ghiaia", None)
+    assert [hit[2] for hit in backend.rank("ghiaia", ["task"])] == [1, 2]
+    backend.remove_document("task", 2)
+    assert [hit[2] for hit in backend.rank("ghiaia", ["task"])] == [1]
+
+    backend._compact()
+    assert len(backend) == 3
+    assert [hit[2] for hit in backend.rank("ghiaia", ["task"])] == [1]
+    assert backend.rank("prezzi", ["task"]) == []
+
+
+def test_snippet_escapes_stored_text():
+    """Test that only the highlight tags in a snippet are markup."""
+    backend = InMemorySearchBackend()
+    assert backend._snippet("<script>x</script> asfalto & ghiaia", "asfalto") == (
+        "&lt;script&gt;x&lt;/script&gt; <b>asfalto</b> &amp; ghiaia"
+    )
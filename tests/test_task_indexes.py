@@ -0,0 +1,198 @@
+"""
+EXPLAIN-based regression tests for the task filtering indexes.
+
+These need a disposable PostgreSQL database (psycopg2 URL) in TEST_DATABASE_URL.
+They load 1M tasks (and enough users and events for the suggest lookups) into a
+scratch schema and check the planner picks the indexes.
+"""
+import os
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import create_engine, select, func, literal, literal_column, or_, text
+from sqlalchemy.dialects import postgresql
+from app.api.v1.search import _prefix_key
+from app.core.database import Base
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task, TaskAssignee, TaskStatus
+from app.models.calendar import Calendar, Event
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+SCHEMA = "planora_explain_test"
+TASK_ROWS = 1_000_000
+USER_ROWS = 100_000
+EVENT_ROWS = 200_000
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+@pytest.fixture(scope="module")
+def connection():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.connect() as conn:
+        if not conn.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar():
+            pytest.skip("pg_trgm extension not available")
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+        Base.metadata.create_all(
+            conn,
+            tables=[
+                User.__table__, Project.__table__, Task.__table__, TaskAssignee.__table__,
+                Calendar.__table__, Event.__table__,
+            ],
+            checkfirst=False,
+        )
+        conn.execute(text(
+            "INSERT INTO users (email, full_name, password_hash, role, timezone, preferences, is_active) "
+            "SELECT 'user' || g || '@example.com', 'Member ' || g, 'x', 'USER', 'UTC', '{}', true "
+            f"FROM generate_series(1, {USER_ROWS}) g"
+        ))
+        conn.execute(text(
+            "INSERT INTO projects (name, owner_id, acl, color, is_active) "
+            "SELECT 'project ' || g, 1 + g % 1000, '{}', '#808080', true "
+            "FROM generate_series(1, 1000) g"
+        ))
+        conn.execute(text(
+            "INSERT INTO tasks (project_id, title, status, priority, due_date, spent, tags, attachments, metadata) "
+            "SELECT 1 + g % 1000, 'task ' || g, "
+            "(ARRAY['TODO','IN_PROGRESS','BLOCKED','DONE'])[1 + g % 4]::taskstatus, "
+            "(ARRAY['LOW','MEDIUM','HIGH','URGENT'])[1 + g % 4]::taskpriority, "
+            "now() + ((g % 365) - 180) * interval '1 day', 0, '[]', '[]', '{}' "
+            f"FROM generate_series(1, {TASK_ROWS}) g"
+        ))
+        conn.execute(text(
+            "INSERT INTO calendars (owner_id, name, scope, source, color, acl, is_visible) "
+            "SELECT g, 'calendar ' || g, 'PERSONAL', 'LOCAL', '#3788d8', '{}', true "
+            "FROM generate_series(1, 1000) g"
+        ))
+        conn.execute(text(
+            "INSERT INTO events (calendar_id, creator_id, title, start, \"end\", all_day, privacy_level, "
+            "attachments, metadata, timezone) "
+            "SELECT 1 + g % 1000, 1 + g % 1000, 'event ' || g, now(), now() + interval '1 hour', false, "
+            "'PRIVATE', '[]', '{}', 'UTC' "
+            f"FROM generate_series(1, {EVENT_ROWS}) g"
+        ))
+        conn.execute(text(
+            "INSERT INTO task_assignees (task_id, user_id, role) "
+            "SELECT g, 1 + g % 1000, 'assignee' "
+            f"FROM generate_series(1, {TASK_ROWS}) g"
+        ))
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+
+        yield conn
+
+        conn.rollback()
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+        conn.commit()
+    engine.dispose()
+
+
+def _plan_indexes(conn, query) -> set:
+    """Return the names of all indexes used by the plan of a query."""
+    compiled = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    indexes = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+        nodes.extend(node.get("Plans", []))
+    return indexes
+
+
+def test_project_status_due_window_uses_composite_index(connection):
+    """Test project/status filters with a due-date window."""
+    now = datetime.now(timezone.utc)
+    query = select(Task.id).where(
+        Task.project_id == 42,
+        Task.status == TaskStatus.TODO,
+        Task.due_date >= now,
+        Task.due_date < now + timedelta(days=7),
+    )
+    assert "ix_tasks_project_id_status_due_date" in _plan_indexes(connection, query)
+
+
+def test_overdue_uses_open_due_date_index(connection):
+    """Test the overdue filter on its own."""
+    query = select(Task.id).where(
+        Task.due_date < datetime.now(timezone.utc) - timedelta(days=170),
+        Task.status != TaskStatus.DONE,
+    )
+    assert "ix_tasks_due_date_open" in _plan_indexes(connection, query)
+
+
+def test_assignee_overdue_count_uses_assignee_index(connection):
+    """Test the dashboard's overdue count for one user."""
+    query = (
+        select(Task.id)
+        .join(TaskAssignee)
+        .where(
+            TaskAssignee.user_id == 7,
+            Task.due_date < datetime.now(timezone.utc),
+            Task.status != TaskStatus.DONE,
+        )
+    )
+    assert "ix_task_assignees_user_id_task_id" in _plan_indexes(connection, query)
+
+
+def test_search_uses_search_vector_index(connection):
+    """Test the full-text match used by /search."""
+    ts_query = func.plainto_tsquery(literal_column("'italian'"), "424242")
+    query = select(Task.id, func.ts_rank_cd(Task.search_vector, ts_query)).where(
+        Task.search_vector.op("@@")(ts_query)
+    )
+    assert "ix_tasks_search_vector" in _plan_indexes(connection, query)
+
+
+def test_title_fallback_uses_trigram_index(connection):
+    """Test the substring / word-similarity fallback of /search."""
+    query = select(Task.id).where(
+        or_(
+            Task.title.ilike("%k 42424%"),
+            literal("tsak 424242").op("<%")(Task.title),
+        )
+    )
+    assert "ix_tasks_title_trgm" in _plan_indexes(connection, query)
+
+
+def test_suggest_uses_title_prefix_index(connection):
+    """Test the title prefix lookup of /search/suggest, ordered straight from the index."""
+    query = (
+        select(Task.id, Task.title)
+        .where(_prefix_key(Task.title).like("task 4242%"))
+        .order_by(_prefix_key(Task.title))
+        .limit(10)
+    )
+    assert "ix_tasks_title_prefix" in _plan_indexes(connection, query)
+
+
+def test_suggest_uses_event_title_prefix_index(connection):
+    """Test the event title prefix lookup of /search/suggest."""
+    query = (
+        select(Event.id, Event.title)
+        .where(_prefix_key(Event.title).like("event 4242%"))
+        .order_by(_prefix_key(Event.title))
+        .limit(10)
+    )
+    assert "ix_events_title_prefix" in _plan_indexes(connection, query)
+
+
+def test_suggest_uses_user_prefix_indexes(connection):
+    """Test the name-or-email prefix lookup of /search/suggest."""
+    query = (
+        select(User.id)
+        .where(
+            User.is_active == True,
+            or_(_prefix_key(User.full_name).like("member 4242%"), _prefix_key(User.email).like("user4242%")),
+        )
+        .limit(10)
+    )
+    assert {"ix_users_full_name_prefix", "ix_users_email_prefix"} <= _plan_indexes(connection, query)
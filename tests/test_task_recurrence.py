@@ -0,0 +1,70 @@
+"""
+Database tests for recurring task templates and their generated instances.
+
+These need a disposable PostgreSQL database (psycopg2 URL) in TEST_DATABASE_URL.
+"""
+import os
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.models.task import Task
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+SCHEMA = "planora_recurrence_test"
+TABLES = (
+    "users", "projects", "tasks", "task_assignees", "task_watchers",
+    "task_dependencies", "tags", "task_tags", "task_comments",
+)
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-c search_path={SCHEMA},public"})
+    with engine.begin() as conn:
+        if not conn.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar():
+            pytest.skip("pg_trgm extension not available")
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        Base.metadata.create_all(
+            conn,
+            tables=[table for table in Base.metadata.sorted_tables if table.name in TABLES],
+            checkfirst=False,
+        )
+
+    yield engine
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    engine.dispose()
+
+
+def test_deleting_template_keeps_generated_instances(engine):
+    """Instances stay behind, detached from the template, instead of failing the delete."""
+    occurrence = datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+    with Session(engine) as db:
+        template = Task(title="Weekly report", recurrence="FREQ=WEEKLY", next_occurrence_at=occurrence)
+        db.add(template)
+        db.flush()
+        instance = Task(
+            title="Weekly report",
+            due_date=occurrence,
+            recurrence_template_id=template.id,
+            occurrence_at=occurrence,
+        )
+        db.add(instance)
+        db.commit()
+        template_id, instance_id = template.id, instance.id
+
+        db.delete(template)
+        db.commit()
+
+    with Session(engine) as db:
+        assert db.get(Task, template_id) is None
+        assert db.execute(
+            select(Task.recurrence_template_id).where(Task.id == instance_id)
+        ).one() == (None,)
@@ -0,0 +1,20 @@
+"""
+Tests for spreading task estimates over the workload heatmap days.
+"""
+from datetime import date
+import pytest
+from app.services.workload import task_hours
+
+
+def test_long_lived_task_due_soon_is_spread_over_the_days_left():
+    """Remaining hours of an old task go on today..due day, and an overdue task lands on today."""
+    today = date(2026, 1, 1)
+    tasks = [
+        (0, date(2025, 10, 1), date(2026, 1, 2), 10.0),
+        (1, date(2025, 11, 3), date(2025, 12, 15), 4.0),
+    ]
+
+    matrix = task_hours(today, 7, 2, tasks, today)
+
+    assert matrix[0].tolist() == pytest.approx([5.0, 5.0, 0, 0, 0, 0, 0])
+    assert matrix[1].tolist() == pytest.approx([4.0, 0, 0, 0, 0, 0, 0])